@@ -0,0 +1,41 @@
+import os
+
+import psycopg2
+from psycopg2 import sql
+
+ADMIN_DATABASE = os.getenv("TEST_ADMIN_DB", "postgres")
+
+
+def admin_connect(db_config):
+    """Connect to the maintenance database that can create and drop databases."""
+    connection = psycopg2.connect(
+        host=db_config["host"],
+        user=db_config["user"],
+        password=db_config["password"],
+        database=ADMIN_DATABASE,
+        port=db_config["port"],
+    )
+    connection.autocommit = True
+    return connection
+
+
+def terminate_connections(cursor, name):
+    """Disconnect every other session from database name."""
+    cursor.execute(
+        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+        "WHERE datname = %s AND pid <> pg_backend_pid()",
+        (name,),
+    )
+
+
+def drop_database(cursor, name):
+    cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(name)))
+
+
+def clone_database(cursor, name, template):
+    """Create name as a file-level copy of template (which must be idle)."""
+    cursor.execute(
+        sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+            sql.Identifier(name), sql.Identifier(template)
+        )
+    )
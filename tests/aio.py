@@ -0,0 +1,201 @@
+import asyncio
+import time
+import unittest
+
+import psycopg2
+from psycopg2 import extensions
+
+from tests.helpers import resolve_db_config
+
+ASYNC_POOL_SIZE = 10
+
+
+async def wait_ready(connection):
+    """Drive an asynchronous psycopg2 connection until its current request ends."""
+    loop = asyncio.get_running_loop()
+    fileno = connection.fileno()
+    while True:
+        state = connection.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state == extensions.POLL_READ:
+            add, remove = loop.add_reader, loop.remove_reader
+        elif state == extensions.POLL_WRITE:
+            add, remove = loop.add_writer, loop.remove_writer
+        else:
+            raise psycopg2.OperationalError(f"Unexpected poll state: {state}")
+
+        ready = loop.create_future()
+        add(fileno, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            remove(fileno)
+
+
+class AsyncConnection:
+    """Asynchronous psycopg2 connection that runs one statement at a time.
+
+    Asynchronous connections are always in autocommit mode: transactions are
+    opened with an explicit BEGIN.
+    """
+
+    def __init__(self, connection):
+        self.raw = connection
+
+    @classmethod
+    async def connect(cls, db_config):
+        connection = psycopg2.connect(
+            host=db_config["host"],
+            user=db_config["user"],
+            password=db_config["password"],
+            database=db_config["database"],
+            port=db_config["port"],
+            async_=True,
+        )
+        await wait_ready(connection)
+        return cls(connection)
+
+    @property
+    def closed(self):
+        return bool(self.raw.closed)
+
+    @property
+    def busy(self):
+        return self.raw.isexecuting()
+
+    @property
+    def in_transaction(self):
+        return self.raw.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE
+
+    async def execute(self, query, params=None):
+        """Run one statement; return (rows or None, rowcount)."""
+        cursor = self.raw.cursor()
+        try:
+            cursor.execute(query, params)
+            await wait_ready(self.raw)
+            rows = cursor.fetchall() if cursor.description is not None else None
+            return rows, cursor.rowcount
+        finally:
+            cursor.close()
+
+    async def fetchone(self, query, params=None):
+        rows, _ = await self.execute(query, params)
+        return rows[0] if rows else None
+
+    async def rollback(self):
+        if self.in_transaction:
+            await self.execute("ROLLBACK")
+
+    def close(self):
+        if not self.raw.closed:
+            self.raw.close()
+
+
+class AsyncConnectionPool:
+    """Asyncio counterpart of ConnectionPool with at most max_size connections."""
+
+    def __init__(self, db_config, max_size=ASYNC_POOL_SIZE):
+        self.db_config = dict(db_config)
+        self.max_size = max_size
+        self._idle = []
+        self._limit = None
+        self._limit_loop = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "handshakes": 0,
+            "handshake_seconds": 0.0,
+        }
+
+    def _loop_limit(self):
+        # asyncio primitives belong to one loop, and IsolatedAsyncioTestCase
+        # runs every test in a new one.
+        loop = asyncio.get_running_loop()
+        if self._limit_loop is not loop:
+            self._limit = asyncio.Semaphore(self.max_size)
+            self._limit_loop = loop
+        return self._limit
+
+    async def acquire(self):
+        """Wait for a free slot and return an idle or freshly opened connection."""
+        await self._loop_limit().acquire()
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if not connection.closed:
+                    self.stats["hits"] += 1
+                    return connection
+            self.stats["misses"] += 1
+            started = time.perf_counter()
+            connection = await AsyncConnection.connect(self.db_config)
+            self.stats["handshakes"] += 1
+            self.stats["handshake_seconds"] += time.perf_counter() - started
+            return connection
+        except BaseException:
+            self._limit.release()
+            raise
+
+    async def release(self, connection, reset=True):
+        """Roll back, optionally reset the session, and free the slot."""
+        try:
+            if connection.closed or connection.busy:
+                connection.close()
+                return
+            try:
+                await connection.rollback()
+                if reset:
+                    await connection.execute("RESET ALL; DISCARD TEMP")
+            except psycopg2.Error:
+                connection.close()
+                return
+            self._idle.append(connection)
+        finally:
+            self._limit.release()
+
+    def close_all(self):
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+_async_pools = {}
+
+
+def get_async_pool(db_config, max_size=ASYNC_POOL_SIZE):
+    """Return the shared asynchronous pool for db_config."""
+    key = tuple(sorted(db_config.items()))
+    pool = _async_pools.get(key)
+    if pool is None:
+        pool = _async_pools[key] = AsyncConnectionPool(db_config, max_size)
+    return pool
+
+
+class AsyncBaseClassForDateBase(unittest.IsolatedAsyncioTestCase):
+    """Asyncio counterpart of BaseClassForDateBase.
+
+    Every test borrows an asynchronous connection, runs inside an explicit
+    transaction and is rolled back in asyncTearDown.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Load configuration based on environment variable."""
+        cls.db_config = resolve_db_config()
+
+    async def asyncSetUp(self):
+        """Borrow a connection and open the test transaction."""
+        self.pool = get_async_pool(self.db_config)
+        try:
+            self.connection = await self.pool.acquire()
+        except (Exception, psycopg2.DatabaseError) as error:
+            self.fail(f"Database connection failed: {error}")
+        try:
+            await self.connection.execute("BEGIN")
+        except psycopg2.Error:
+            await self.pool.release(self.connection)
+            raise
+
+    async def asyncTearDown(self):
+        """Roll back the test transaction and return the connection."""
+        await self.pool.release(self.connection)
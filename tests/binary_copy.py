@@ -0,0 +1,276 @@
+import datetime
+import struct
+from array import array
+
+from tests.datagen import optional_numpy
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+PG_EPOCH = datetime.datetime(2000, 1, 1)
+PG_EPOCH_ORDINAL = PG_EPOCH.toordinal()
+# PostgreSQL sends +-infinity as the extremes of the integer type.
+DATE_INFINITY = {"infinity": (1 << 31) - 1, "-infinity": -(1 << 31)}
+TIMESTAMP_INFINITY = {"infinity": (1 << 63) - 1, "-infinity": -(1 << 63)}
+
+_HEADER = struct.Struct("!11sii")
+_INT16 = struct.Struct("!h")
+_INT32 = struct.Struct("!i")
+_INT64 = struct.Struct("!q")
+_UNPACKERS = {"i": _INT32.unpack_from, "q": _INT64.unpack_from}
+
+# Column type -> array typecode; text is variable-width.
+COLUMN_TYPECODES = {"text": None, "date": "i", "timestamp": "q"}
+
+
+def date_to_day(value):
+    """A date or 'YYYY-MM-DD' string as days since 2000-01-01, as COPY sends it."""
+    if value in DATE_INFINITY:
+        return DATE_INFINITY[value]
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return value.toordinal() - PG_EPOCH_ORDINAL
+
+
+def timestamp_to_microseconds(value):
+    """A datetime or ISO string as microseconds since 2000-01-01."""
+    if value in TIMESTAMP_INFINITY:
+        return TIMESTAMP_INFINITY[value]
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    delta = value - PG_EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+ENCODERS = {
+    "text": lambda value: value.encode("utf-8"),
+    "date": date_to_day,
+    "timestamp": timestamp_to_microseconds,
+}
+
+
+class TextColumn:
+    """Variable-length values packed into one buffer, Arrow style.
+
+    Value i is data[offsets[i]:offsets[i + 1]]; NULLs are empty and listed in
+    nulls.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+        self.nulls = set()
+
+    def clear(self):
+        del self.data[:]
+        del self.offsets[1:]
+        self.nulls.clear()
+
+    def value(self, index):
+        if index in self.nulls:
+            return None
+        return bytes(self.data[self.offsets[index] : self.offsets[index + 1]])
+
+
+class FixedColumn:
+    """Fixed-width values in one array; NULLs are stored as 0 and listed in nulls.
+
+    No sentinel value is free: INT32_MIN and INT64_MIN are how PostgreSQL
+    sends -infinity dates and timestamps.
+    """
+
+    def __init__(self, typecode):
+        self.values = array(typecode)
+        self.nulls = set()
+
+    def clear(self):
+        del self.values[:]
+        self.nulls.clear()
+
+    def value(self, index):
+        return None if index in self.nulls else self.values[index]
+
+
+class BinaryCopyReader:
+    """File object for copy_expert that decodes COPY ... (FORMAT binary).
+
+    Incoming chunks go into one reusable buffer; complete tuples are decoded
+    straight into per-column arrays (text into TextColumn, dates into int32
+    day offsets and timestamps into int64 microseconds in a FixedColumn), so
+    no Python object is kept per row. Call clear() to reuse the
+    reader and its allocations for another COPY.
+    """
+
+    def __init__(self, types):
+        for column_type in types:
+            if column_type not in COLUMN_TYPECODES:
+                raise ValueError(f"Unsupported column type: {column_type}")
+        self.types = tuple(types)
+        self.columns = []
+        for column_type in self.types:
+            typecode = COLUMN_TYPECODES[column_type]
+            self.columns.append(
+                TextColumn() if typecode is None else FixedColumn(typecode)
+            )
+        # Per column: where values go and how fixed-width values are read.
+        self._plan = [
+            (column, None)
+            if isinstance(column, TextColumn)
+            else (column, _UNPACKERS[column.values.typecode])
+            for column in self.columns
+        ]
+        self._buffer = bytearray()
+        self.clear()
+
+    def clear(self):
+        for column in self.columns:
+            column.clear()
+        del self._buffer[:]
+        self.rows = 0
+        self._header_seen = False
+        self.finished = False
+
+    def __len__(self):
+        return self.rows
+
+    def write(self, data):
+        self._buffer += data
+        consumed = self._decode()
+        if consumed:
+            del self._buffer[:consumed]
+        return len(data)
+
+    def _decode(self):
+        buffer = self._buffer
+        size = len(buffer)
+        position = 0
+        if not self._header_seen:
+            if size < _HEADER.size:
+                return 0
+            signature, _, extension = _HEADER.unpack_from(buffer, 0)
+            if signature != COPY_SIGNATURE:
+                raise ValueError("Not a binary COPY stream")
+            if size < _HEADER.size + extension:
+                return 0
+            position = _HEADER.size + extension
+            self._header_seen = True
+
+        plan = self._plan
+        field_count = len(plan)
+        rows = self.rows
+        with memoryview(buffer) as view:
+            while position + 2 <= size:
+                (fields,) = _INT16.unpack_from(buffer, position)
+                if fields == -1:
+                    self.finished = True
+                    position += 2
+                    break
+                if fields != field_count:
+                    raise ValueError(f"Expected {field_count} fields, got {fields}")
+                start = position
+                position += 2
+                decoded = 0
+                for column, unpack in plan:
+                    if position + 4 > size:
+                        break
+                    (length,) = _INT32.unpack_from(buffer, position)
+                    position += 4
+                    if position + max(length, 0) > size:
+                        break
+                    if unpack is None:
+                        if length < 0:
+                            column.nulls.add(rows)
+                        else:
+                            column.data += view[position : position + length]
+                            position += length
+                        column.offsets.append(len(column.data))
+                    elif length < 0:
+                        column.nulls.add(rows)
+                        column.values.append(0)
+                    else:
+                        column.values.append(unpack(buffer, position)[0])
+                        position += length
+                    decoded += 1
+                if decoded < field_count:
+                    # The tuple continues in the next chunk: undo its fields.
+                    self._undo(rows, decoded)
+                    position = start
+                    break
+                rows += 1
+        self.rows = rows
+        return position
+
+    def _undo(self, row, fields):
+        for column, unpack in self._plan[:fields]:
+            if unpack is None:
+                del column.offsets[-1]
+                del column.data[column.offsets[-1] :]
+            else:
+                del column.values[-1]
+            column.nulls.discard(row)
+
+
+def copy_columns(cursor, query, types, reader=None):
+    """Run COPY (query) TO STDOUT (FORMAT binary) into a BinaryCopyReader."""
+    if reader is None:
+        reader = BinaryCopyReader(types)
+    else:
+        reader.clear()
+    cursor.copy_expert(f"COPY ({query}) TO STDOUT (FORMAT binary)", reader)
+    return reader
+
+
+def missing_from_columns(reader, expected):
+    """Return the expected rows absent from the decoded columns.
+
+    Expected values are encoded once into the binary representation. The
+    first fixed-width column narrows the rows to compare, with numpy.isin over
+    the raw array when NumPy is installed, so only rows that share a value
+    with some expected row are ever turned into Python objects.
+    """
+    encoders = [ENCODERS[t] for t in reader.types]
+    wanted = {}
+    for row in expected:
+        key = tuple(
+            None if value is None else encode(value)
+            for encode, value in zip(encoders, row)
+        )
+        wanted.setdefault(key, []).append(row)
+    if not wanted:
+        return []
+
+    filter_column = next(
+        (n for n, t in enumerate(reader.types) if COLUMN_TYPECODES[t] is not None),
+        None,
+    )
+    if filter_column is None:
+        candidates = range(reader.rows)
+    else:
+        values = {key[filter_column] for key in wanted}
+        candidates = _matching_indexes(reader.columns[filter_column], values)
+
+    for index in candidates:
+        key = tuple(column.value(index) for column in reader.columns)
+        wanted.pop(key, None)
+        if not wanted:
+            break
+    return [row for rows in wanted.values() for row in rows]
+
+
+def _matching_indexes(column, values):
+    """Sorted indexes of column rows whose value is in values (None = NULL)."""
+    found = set(column.nulls) if None in values else set()
+    values = [value for value in values if value is not None]
+    if values:
+        numpy = optional_numpy()
+        if numpy is None:
+            wanted = set(values)
+            found.update(
+                index
+                for index, value in enumerate(column.values)
+                if value in wanted and index not in column.nulls
+            )
+        else:
+            dtype = numpy.int32 if column.values.typecode == "i" else numpy.int64
+            raw = numpy.frombuffer(column.values, dtype=dtype)
+            matches = numpy.flatnonzero(numpy.isin(raw, values)).tolist()
+            found.update(index for index in matches if index not in column.nulls)
+    return sorted(found)
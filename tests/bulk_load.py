@@ -0,0 +1,87 @@
+import os
+
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+PAGE_SIZE = int(os.getenv("TEST_BULK_PAGE_SIZE", "1000"))
+COPY_CHUNK_SIZE = 1 << 20
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_text_value(value):
+    """Render one value in the text format that COPY FROM STDIN expects."""
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_text_line(row):
+    return "\t".join(copy_text_value(value) for value in row) + "\n"
+
+
+class RowStream:
+    """Read-only file object that renders rows into COPY text lazily."""
+
+    def __init__(self, rows, render=copy_text_line):
+        self._rows = iter(rows)
+        self._render = render
+        self._pending = ""
+        self.rows_read = 0
+
+    def read(self, size=-1):
+        chunks = [self._pending]
+        length = len(self._pending)
+        for row in self._rows:
+            line = self._render(row)
+            chunks.append(line)
+            length += len(line)
+            self.rows_read += 1
+            if 0 <= size <= length:
+                break
+        data = "".join(chunks)
+        if 0 <= size < len(data):
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = ""
+        return data
+
+
+def copy_text(cursor, table, columns, file):
+    """COPY text-format data read from file into table; return the row count."""
+    query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+    cursor.copy_expert(query, file, size=COPY_CHUNK_SIZE)
+    return cursor.rowcount
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream rows into table with COPY FROM STDIN; return the number loaded."""
+    stream = RowStream(rows)
+    rowcount = copy_text(cursor, table, columns, stream)
+    return rowcount if rowcount >= 0 else stream.rows_read
+
+
+def insert_rows_paged(cursor, table, columns, rows, page_size=PAGE_SIZE):
+    """Insert rows with multi-row VALUES statements of page_size rows each."""
+    counted = _CountingIterator(rows)
+    query = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+        sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+    execute_values(cursor, query, counted, page_size=page_size)
+    return counted.count
+
+
+class _CountingIterator:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows)
+        self.count += 1
+        return row
@@ -0,0 +1,153 @@
+import atexit
+import json
+import os
+import weakref
+from collections import OrderedDict
+
+from psycopg2 import extensions
+
+from tests.prepared import DdlTracker
+
+CATALOG_CACHE = os.getenv("TEST_CATALOG_CACHE")
+CATALOG_CACHE_SIZE = int(os.getenv("TEST_CATALOG_CACHE_SIZE", "256"))
+
+# Any DDL rewrites the pg_class/pg_attribute rows it touches, which gives them
+# a new xmin; ANALYZE and VACUUM update pg_class in place and do not.
+FINGERPRINT_QUERY = """
+    SELECT md5(
+        COALESCE((
+            SELECT string_agg(c.oid::text || ':' || c.xmin::text, ',' ORDER BY c.oid)
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+              AND n.nspname NOT LIKE 'pg_toast%'
+        ), '') || '|' || COALESCE((
+            SELECT string_agg(
+                a.attrelid::text || '.' || a.attnum::text || ':' || a.xmin::text,
+                ',' ORDER BY a.attrelid, a.attnum
+            )
+            FROM pg_catalog.pg_attribute a
+            JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+              AND n.nspname NOT LIKE 'pg_toast%'
+              AND a.attnum > 0
+        ), '')
+    )
+"""
+
+
+class _SchemaState:
+    __slots__ = ("fingerprint", "ddl")
+
+    def __init__(self):
+        self.fingerprint = None
+        self.ddl = DdlTracker()
+
+
+class CatalogCache:
+    """On-disk LRU of read-only catalog query results, keyed by schema version.
+
+    The key is a fingerprint of the non-system pg_class/pg_attribute rows,
+    computed once per connection and again only after the connection's own
+    DDL is undone, so a hit costs no query at all. While a connection has
+    uncommitted DDL (until its transaction ends, or it rolls back to a
+    savepoint taken before the DDL) lookups bypass the cache. DDL committed
+    by other sessions is not noticed until the next session.
+    """
+
+    def __init__(self, path, size=CATALOG_CACHE_SIZE):
+        self.path = path
+        self.size = size
+        self.entries = None
+        self.changed = False
+        self._states = weakref.WeakKeyDictionary()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "fingerprints": 0}
+
+    @property
+    def enabled(self):
+        return bool(self.path) and self.size > 0
+
+    def observe(self, connection, query):
+        """Track DDL and savepoints of every statement the harness sends.
+
+        The pool's session reset runs on a plain cursor and never gets here.
+        """
+        state = self._state(connection)
+        if state.ddl.observe(query):
+            state.fingerprint = None
+
+    def fetchall(self, cursor, query, params=None):
+        """Rows of a read-only catalog query, from the cache when possible."""
+        fingerprint = self._fingerprint(cursor)
+        if fingerprint is None:
+            self.stats["bypassed"] += 1
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+        entries = self._load()
+        key = json.dumps([fingerprint, query, params], ensure_ascii=False)
+        rows = entries.get(key)
+        if rows is not None:
+            self.stats["hits"] += 1
+            entries.move_to_end(key)
+            return [tuple(row) for row in rows]
+
+        self.stats["misses"] += 1
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        try:
+            json.dumps(rows)
+        except TypeError:
+            return rows
+        entries[key] = [list(row) for row in rows]
+        while len(entries) > self.size:
+            entries.popitem(last=False)
+        self.changed = True
+        return rows
+
+    def _state(self, connection):
+        state = self._states.get(connection)
+        if state is None:
+            state = self._states[connection] = _SchemaState()
+        return state
+
+    def _fingerprint(self, cursor):
+        connection = cursor.connection
+        state = self._state(connection)
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            state.ddl.transaction_ended()
+        if state.ddl.pending:
+            return None
+        if state.fingerprint is None:
+            self.stats["fingerprints"] += 1
+            cursor.execute(FINGERPRINT_QUERY)
+            state.fingerprint = cursor.fetchone()[0]
+        return state.fingerprint
+
+    def _load(self):
+        if self.entries is None:
+            self.entries = OrderedDict()
+            try:
+                with open(self.path, encoding="utf-8") as cache_file:
+                    self.entries.update(json.load(cache_file)["entries"])
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        return self.entries
+
+    def write(self):
+        with open(self.path, "w", encoding="utf-8") as cache_file:
+            json.dump(
+                {"entries": list(self.entries.items())}, cache_file, ensure_ascii=False
+            )
+        self.changed = False
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE)
+
+
+@atexit.register
+def _write_catalog_cache():
+    if catalog_cache.enabled and catalog_cache.changed:
+        catalog_cache.write()
@@ -0,0 +1,173 @@
+import atexit
+import os
+import sys
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from tests.cursors import HarnessCursor
+from tests.query_stats import query_stats
+
+IDLE_PROBE_SECONDS = float(os.getenv("TEST_POOL_IDLE_PROBE_SECONDS", "30"))
+MAX_IDLE_CONNECTIONS = int(os.getenv("TEST_POOL_MAX_IDLE", "4"))
+
+_pools = {}
+_pools_pid = os.getpid()
+_pools_lock = threading.Lock()
+_inherited_pools = []
+
+
+class ConnectionPool:
+    """Process-wide pool of connections that share one db_config."""
+
+    def __init__(
+        self,
+        db_config,
+        idle_probe_seconds=IDLE_PROBE_SECONDS,
+        max_idle=MAX_IDLE_CONNECTIONS,
+    ):
+        self.db_config = dict(db_config)
+        self.idle_probe_seconds = idle_probe_seconds
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "probes": 0,
+            "discarded": 0,
+            "handshakes": 0,
+            "handshake_seconds": 0.0,
+        }
+
+    def acquire(self):
+        """Borrow an idle connection, or open a new one if none is usable."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, returned_at = self._idle.pop()
+
+            if connection.closed:
+                self._discard(connection)
+                continue
+            idle_for = time.monotonic() - returned_at
+            if idle_for > self.idle_probe_seconds and not self._probe(connection):
+                self._discard(connection)
+                continue
+
+            self.stats["hits"] += 1
+            return connection
+
+        self.stats["misses"] += 1
+        return self._connect()
+
+    def release(self, connection):
+        """Reset session state and put the connection back into the pool."""
+        if connection.closed:
+            self._discard(connection)
+            return
+
+        try:
+            connection.rollback()
+            # RESET ALL inside a transaction would be undone by the next rollback.
+            connection.autocommit = True
+            # A plain cursor: the reset is not test traffic for the harness hooks.
+            with connection.cursor(cursor_factory=extensions.cursor) as cursor:
+                cursor.execute("RESET ALL")
+                cursor.execute("DISCARD TEMP")
+            connection.autocommit = False
+        except psycopg2.Error:
+            self._discard(connection)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._discard(connection)
+
+    def close_all(self):
+        """Close every idle connection held by the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _connect(self):
+        started = time.perf_counter()
+        connection = psycopg2.connect(
+            host=self.db_config["host"],
+            user=self.db_config["user"],
+            password=self.db_config["password"],
+            database=self.db_config["database"],
+            port=self.db_config["port"],
+            cursor_factory=HarnessCursor,
+        )
+        elapsed = time.perf_counter() - started
+        self.stats["handshakes"] += 1
+        self.stats["handshake_seconds"] += elapsed
+        if query_stats.enabled:
+            query_stats.record("<connect>", "connect", elapsed)
+        connection.autocommit = False
+        return connection
+
+    def _probe(self, connection):
+        self.stats["probes"] += 1
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                result = cursor.fetchone()
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return result is not None and result[0] == 1
+
+    def _discard(self, connection):
+        self.stats["discarded"] += 1
+        if not connection.closed:
+            connection.close()
+
+
+def get_pool(db_config):
+    """Return the shared pool for db_config, creating it on first use."""
+    global _pools_pid
+    key = tuple(sorted(db_config.items()))
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Sockets inherited over fork belong to the parent: closing them here
+            # would terminate the parent's sessions, so keep them alive unused.
+            _inherited_pools.extend(_pools.values())
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_config)
+    return pool
+
+
+def pool_stats():
+    """Sum the counters of every pool in this process."""
+    totals = {}
+    for pool in list(_pools.values()):
+        for name, value in pool.stats.items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+@atexit.register
+def _close_pools():
+    if os.getenv("TEST_POOL_STATS") and _pools:
+        stats = pool_stats()
+        print(
+            "Connection pool: {hits} hits, {misses} misses, {probes} probes, "
+            "{discarded} discarded, {handshakes} handshakes "
+            "in {handshake_seconds:.3f}s".format(**stats),
+            file=sys.stderr,
+        )
+    if _pools_pid != os.getpid():
+        return
+    for pool in list(_pools.values()):
+        pool.close_all()
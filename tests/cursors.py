@@ -0,0 +1,87 @@
+import time
+
+from psycopg2 import extensions
+
+from tests.catalog_cache import catalog_cache
+from tests.impact import impact_recorder
+from tests.prepared import CACHE_SIZE, statement_cache
+from tests.query_stats import normalize_sql, query_stats
+
+
+class HarnessCursor(extensions.cursor):
+    """Cursor used by every harness connection; times calls when enabled.
+
+    While tests.impact records, every statement is also attributed to the
+    running test; with TEST_CATALOG_CACHE set, DDL and savepoints are tracked
+    for the catalog lookup cache.
+
+    With TEST_PREPARED_STATEMENTS set, client-side cursors run hot
+    parameterized statements through the connection's prepared-statement
+    cache; set `prepare` on a cursor to opt in or out regardless.
+    """
+
+    _last_statement = None
+    prepare = CACHE_SIZE > 0
+
+    def execute(self, query, vars=None):
+        if not self.prepare or self.name is not None:
+            return self._timed_execute(super().execute, query, vars)
+        cache = statement_cache(self.connection)
+        return self._timed_execute(self._execute_cached, cache, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed_execute(super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed_execute(super().copy_expert, sql, file, size)
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, size or self.arraysize)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def _execute_cached(self, cache, query, vars):
+        return cache.execute(self, super().execute, query, vars)
+
+    def _statement_text(self, query):
+        if isinstance(query, bytes):
+            return query.decode("utf-8", "replace")
+        if not isinstance(query, str):
+            return query.as_string(self)
+        return query
+
+    def _timed_execute(self, execute, query, *args):
+        if catalog_cache.enabled and isinstance(query, str):
+            catalog_cache.observe(self.connection, query)
+        if impact_recorder.enabled:
+            impact_recorder.record(
+                query_stats.current_test,
+                self._statement_text(query),
+                args[0] if args else None,
+            )
+        if not query_stats.enabled:
+            return execute(query, *args)
+        statement = normalize_sql(self._statement_text(query))
+        self._last_statement = statement
+        started = time.perf_counter()
+        try:
+            return execute(query, *args)
+        finally:
+            query_stats.record(statement, "execute", time.perf_counter() - started)
+
+    def _timed_fetch(self, fetch, *args):
+        if not query_stats.enabled:
+            return fetch(*args)
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            query_stats.record(
+                self._last_statement or "<unknown>",
+                "fetch",
+                time.perf_counter() - started,
+            )
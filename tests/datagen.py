@@ -0,0 +1,176 @@
+import datetime
+import functools
+import io
+import os
+import random
+
+from tests.bulk_load import copy_text_value
+
+POOL_SIZE = int(os.getenv("TEST_DATAGEN_POOL_SIZE", "10000"))
+BATCH_SIZE = int(os.getenv("TEST_DATAGEN_BATCH_SIZE", "100000"))
+
+
+@functools.lru_cache(maxsize=None)
+def _faker(locale):
+    # Importing faker and loading a locale is most of the suite's startup time.
+    from faker import Faker
+
+    return Faker(locale) if locale else Faker()
+
+
+@functools.lru_cache(maxsize=None)
+def optional_numpy():
+    """The numpy module, imported on first use, or None if it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def get_faker(locale=None, seed=None):
+    """Return the session's Faker for locale; loading a locale happens once.
+
+    Passing seed reseeds the shared instance, so later calls that also pass
+    the same seed produce the same values.
+    """
+    faker = _faker(locale)
+    if seed is not None:
+        faker.seed_instance(seed)
+    return faker
+
+
+def date_pool(first, last):
+    """Every day from first to last inclusive, as 'YYYY-MM-DD' strings."""
+    return [
+        datetime.date.fromordinal(ordinal).isoformat()
+        for ordinal in range(first.toordinal(), last.toordinal() + 1)
+    ]
+
+
+class ChunkStream:
+    """Read-only file object over an iterator of text chunks, for COPY."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = ""
+
+    def read(self, size=-1):
+        data = self._pending
+        for chunk in self._chunks:
+            data += chunk
+            if 0 <= size <= len(data):
+                break
+        if 0 <= size < len(data):
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = ""
+        return data
+
+
+class PooledRowGenerator:
+    """Generate rows by sampling each column from a pre-built pool of values.
+
+    Values are generated once (the slow part, e.g. Faker) and then sampled in
+    batches: with NumPy through vectorized fancy indexing, otherwise with
+    random.choices. COPY text for every pool entry is also rendered once, so
+    building a COPY buffer is only string joins.
+    """
+
+    def __init__(self, pools, seed=None):
+        self.pools = [list(pool) for pool in pools]
+        self.copy_pools = [
+            [copy_text_value(value) for value in pool] for pool in self.pools
+        ]
+        self._random = random.Random(seed)
+        numpy = self._numpy = optional_numpy()
+        if numpy is not None:
+            self._numpy_random = numpy.random.default_rng(seed)
+            self._arrays = {
+                id(pool): numpy.array(pool, dtype=object)
+                for pool in self.pools + self.copy_pools
+            }
+
+    def _sample(self, pools, count):
+        if self._numpy is None:
+            return [self._random.choices(pool, k=count) for pool in pools]
+        columns = []
+        for pool in pools:
+            indexes = self._numpy_random.integers(0, len(pool), count)
+            columns.append(self._arrays[id(pool)][indexes].tolist())
+        return columns
+
+    def _batch_sizes(self, count, batch_size):
+        while count > 0:
+            size = min(count, batch_size)
+            yield size
+            count -= size
+
+    def batches(self, count, batch_size=BATCH_SIZE):
+        """Yield lists of up to batch_size row tuples, count rows in total."""
+        for size in self._batch_sizes(count, batch_size):
+            yield list(zip(*self._sample(self.pools, size)))
+
+    def rows(self, count, batch_size=BATCH_SIZE):
+        """Yield count row tuples, generated batch_size at a time."""
+        for batch in self.batches(count, batch_size):
+            yield from batch
+
+    def copy_chunks(self, count, batch_size=BATCH_SIZE):
+        """Yield COPY text, one chunk per batch of rows."""
+        for size in self._batch_sizes(count, batch_size):
+            columns = self._sample(self.copy_pools, size)
+            yield "\n".join(map("\t".join, zip(*columns))) + "\n"
+
+    def copy_stream(self, count, batch_size=BATCH_SIZE):
+        """File object that produces COPY text for count rows on demand."""
+        return ChunkStream(self.copy_chunks(count, batch_size))
+
+    def copy_buffer(self, count, batch_size=BATCH_SIZE):
+        """In-memory COPY text for count rows."""
+        return io.StringIO("".join(self.copy_chunks(count, batch_size)))
+
+
+def name_pool(locales, size, seed=None):
+    """size full names, split evenly across locales."""
+    names = []
+    for number, locale in enumerate(locales):
+        faker = get_faker(locale, None if seed is None else seed + number)
+        names += [faker.name() for _ in range(size // len(locales))]
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def _people_pools(seed, pool_size):
+    return (
+        name_pool(("ru_RU", "en_US"), pool_size, seed),
+        date_pool(datetime.date(1940, 1, 1), datetime.date(2010, 12, 31)),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _persons_pools(seed, pool_size):
+    ru = get_faker("ru_RU", seed)
+    return (
+        [ru.first_name() for _ in range(pool_size)],
+        [ru.last_name() for _ in range(pool_size)],
+        date_pool(datetime.date(1900, 1, 1), datetime.date(2010, 12, 31)),
+        [ru.city_name() for _ in range(pool_size)],
+        [ru.job() for _ in range(pool_size)],
+        ["Вырезки из газет", "Шахматы", "Chess", None],
+    )
+
+
+def people_generator(seed=None, pool_size=POOL_SIZE):
+    """Generator of (name, dateofbirth) rows for the people table.
+
+    Value pools are built once per seed; every call starts a fresh sampler,
+    so the same seed always yields the same rows.
+    """
+    return PooledRowGenerator(_people_pools(seed, pool_size), seed)
+
+
+def persons_generator(seed=None, pool_size=POOL_SIZE):
+    """Generator of (FirstName, FamilyName, DateOfBirth, PlaceOfBirth,
+    Occupation, Hobby) rows for the persons table."""
+    return PooledRowGenerator(_persons_pools(seed, pool_size), seed)
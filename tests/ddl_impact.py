@@ -0,0 +1,179 @@
+import threading
+import time
+
+import psycopg2
+
+from tests.connection_pool import get_pool
+from tests.scale import summarize
+
+DDL_SCENARIOS = {
+    "test_change_column_type": (
+        "ALTER TABLE persons ALTER COLUMN DateOfBirth TYPE timestamp;"
+    ),
+    "test_add_column": "ALTER TABLE persons ADD COLUMN Age int;",
+    "test_delete_column": "ALTER TABLE persons DROP COLUMN Hobby;",
+    "test_rename_column": "ALTER TABLE persons RENAME COLUMN FirstName TO First_Name;",
+}
+
+READ_QUERY = "SELECT COUNT(*) FROM persons"
+WRITE_QUERY = """
+    INSERT INTO Persons
+        (FirstName, FamilyName, DateOfBirth, PlaceOfBirth, Occupation, Hobby)
+    VALUES (%s, %s, TO_DATE(%s, 'YYYY-MM-DD'), %s, %s, %s);
+"""
+WRITE_ROW = (
+    "Майа",
+    "Плисецкая",
+    "1925-11-20",
+    "Москва",
+    "Балерина",
+    "Вырезки из газет",
+)
+
+BLOCKED_QUERY = """
+    SELECT a.pid, a.query_start, EXTRACT(EPOCH FROM clock_timestamp() - a.query_start)
+    FROM pg_stat_activity a
+    WHERE a.wait_event_type = 'Lock' AND %s = ANY(pg_blocking_pids(a.pid))
+"""
+DDL_LOCK_QUERY = """
+    SELECT granted FROM pg_locks
+    WHERE pid = %s AND relation = 'persons'::regclass AND mode = 'AccessExclusiveLock'
+"""
+
+
+class _Traffic(threading.Thread):
+    """Runs one statement against persons in short transactions until stopped."""
+
+    def __init__(self, pool, query, params, stop):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.query = query
+        self.params = params
+        self.stop = stop
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        connection = self.pool.acquire()
+        try:
+            with connection.cursor() as cursor:
+                while not self.stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        cursor.execute(self.query, self.params)
+                    except psycopg2.Error:
+                        self.errors += 1
+                    connection.rollback()
+                    self.latencies.append(time.perf_counter() - started)
+        finally:
+            self.pool.release(connection)
+
+
+class _LockSampler(threading.Thread):
+    """Samples pg_locks and pg_stat_activity while the DDL runs."""
+
+    def __init__(self, pool, stop, interval):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.stop = stop
+        self.interval = interval
+        self.ddl_pid = None
+        self.lock_granted_at = None
+        self.lock_waiting_seen = False
+        self.blocked = {}
+        self.samples = 0
+
+    def run(self):
+        connection = self.pool.acquire()
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                while not self.stop.is_set():
+                    if self.ddl_pid is not None:
+                        self.sample(cursor)
+                    time.sleep(self.interval)
+        finally:
+            connection.autocommit = False
+            self.pool.release(connection)
+
+    def sample(self, cursor):
+        self.samples += 1
+        now = time.perf_counter()
+        cursor.execute(DDL_LOCK_QUERY, (self.ddl_pid,))
+        lock = cursor.fetchone()
+        if lock is not None and lock[0] and self.lock_granted_at is None:
+            self.lock_granted_at = now
+        elif lock is not None and not lock[0]:
+            self.lock_waiting_seen = True
+
+        cursor.execute(BLOCKED_QUERY, (self.ddl_pid,))
+        for pid, query_start, waited in cursor.fetchall():
+            key = (pid, query_start)
+            self.blocked[key] = max(self.blocked.get(key, 0.0), float(waited))
+
+
+def run_ddl_impact(
+    db_config,
+    ddl,
+    readers=4,
+    writers=2,
+    warmup=0.2,
+    cooldown=0.2,
+    interval=0.005,
+):
+    """Run ddl in a rolled-back transaction while readers and writers hit persons.
+
+    Returns lock hold time, how many queries were blocked behind the DDL and for
+    how long, traffic latencies, and whether the statement rewrote the table
+    (its relfilenode changed) or only touched the catalog.
+    """
+    pool = get_pool(db_config)
+    stop = threading.Event()
+    traffic = [_Traffic(pool, READ_QUERY, None, stop) for _ in range(readers)]
+    traffic += [_Traffic(pool, WRITE_QUERY, WRITE_ROW, stop) for _ in range(writers)]
+    sampler = _LockSampler(pool, stop, interval)
+    for thread in [sampler, *traffic]:
+        thread.start()
+
+    connection = pool.acquire()
+    try:
+        time.sleep(warmup)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid(), pg_relation_filenode('persons')")
+            ddl_pid, filenode_before = cursor.fetchone()
+            connection.rollback()
+
+            sampler.ddl_pid = ddl_pid
+            started = time.perf_counter()
+            cursor.execute(ddl)
+            executed = time.perf_counter()
+            cursor.execute("SELECT pg_relation_filenode('persons')")
+            filenode_after = cursor.fetchone()[0]
+            connection.rollback()
+            finished = time.perf_counter()
+        time.sleep(cooldown)
+    finally:
+        stop.set()
+        for thread in [sampler, *traffic]:
+            thread.join()
+        pool.release(connection)
+
+    lock_granted_at = sampler.lock_granted_at or started
+    read_latencies = [t for thread in traffic[:readers] for t in thread.latencies]
+    write_latencies = [t for thread in traffic[readers:] for t in thread.latencies]
+    rewrites_table = filenode_before != filenode_after
+    return {
+        "ddl": ddl.strip(),
+        "kind": "rewrite" if rewrites_table else "metadata-only",
+        "rewrites_table": rewrites_table,
+        "ddl_seconds": executed - started,
+        "transaction_seconds": finished - started,
+        "lock_hold_seconds": finished - lock_granted_at,
+        "ddl_waited_for_lock": sampler.lock_waiting_seen,
+        "blocked_queries": len(sampler.blocked),
+        "longest_wait_seconds": max(sampler.blocked.values(), default=0.0),
+        "samples": sampler.samples,
+        "reads": summarize(read_latencies) if read_latencies else None,
+        "writes": summarize(write_latencies) if write_latencies else None,
+        "traffic_errors": sum(thread.errors for thread in traffic),
+    }
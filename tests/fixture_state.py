@@ -0,0 +1,290 @@
+# эталонное состояние базы: golden-шаблон со схемой и данными people/persons
+# ```python -m tests.fixture_state build   # снять шаблон с рабочей базы
+# python -m tests.fixture_state check      # сравнить контрольные суммы
+# python -m tests.fixture_state reset      # пересоздать рабочую базу из шаблона```
+# при заданном TEST_FIXTURE_RESET="1" проверка (и при расхождении сброс)
+# выполняется один раз за сессию перед первым тестовым классом
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from psycopg2 import sql
+
+from tests.admin import (
+    admin_connect,
+    clone_database,
+    drop_database,
+    terminate_connections,
+)
+from tests.connection_pool import get_pool
+
+FIXTURE_TABLES = ("people", "persons")
+FIXTURE_RESET = os.getenv("TEST_FIXTURE_RESET", "") not in ("", "0")
+FIXTURE_SEED_ROWS = int(os.getenv("TEST_FIXTURE_SEED_ROWS", "0"))
+GOLDEN_SUFFIX = "_golden"
+COMMENT_PREFIX = "fixture-state:"
+
+# Columns the DDL tests rely on; None accepts any type.
+BASELINE_COLUMNS = {
+    "people": {"name": None, "dateofbirth": "date"},
+    "persons": {"firstname": None, "hobby": None, "dateofbirth": "date"},
+}
+
+CATALOG_QUERY = """
+    SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+           a.attnotnull
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_catalog.pg_attribute a
+        ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+    ORDER BY c.relname, a.attnum
+"""
+GOLDEN_QUERY = """
+    SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s
+"""
+
+_ensured = set()
+
+
+class FixtureStateError(Exception):
+    """The working database cannot be captured or restored as the baseline."""
+
+
+def golden_name(db_config):
+    return f"{db_config['database']}{GOLDEN_SUFFIX}"
+
+
+def catalog_columns(cursor):
+    """{table: [(column, type, not null), ...]} for every table in public."""
+    cursor.execute(CATALOG_QUERY)
+    tables = {}
+    for table, column, column_type, not_null in cursor.fetchall():
+        tables.setdefault(table, []).append((column, column_type, not_null))
+    return tables
+
+
+def baseline_problems(tables):
+    """Human-readable differences between tables and BASELINE_COLUMNS."""
+    problems = []
+    for table, expected in BASELINE_COLUMNS.items():
+        if table not in tables:
+            problems.append(f"table {table} is missing")
+            continue
+        types = {column: column_type for column, column_type, _ in tables[table]}
+        for column, expected_type in expected.items():
+            if column not in types:
+                problems.append(f"column {table}.{column} is missing")
+            elif expected_type is not None and types[column] != expected_type:
+                problems.append(
+                    f"column {table}.{column} is {types[column]}, not {expected_type}"
+                )
+    return problems
+
+
+def fixture_checksum(cursor):
+    """Checksum of the fixture tables' catalog entries and contents.
+
+    Row contents are folded into an order-independent sum of row hashes, so
+    the check is one sequential scan per table and does not sort anything.
+    """
+    tables = catalog_columns(cursor)
+    state = {"catalog": {}, "rows": {}}
+    for table in FIXTURE_TABLES:
+        if table not in tables:
+            continue
+        state["catalog"][table] = tables[table]
+        cursor.execute(
+            sql.SQL(
+                "SELECT COUNT(*), COALESCE(SUM(hashtext(t::text)::bigint), 0) "
+                "FROM {} t"
+            ).format(sql.Identifier(table))
+        )
+        state["rows"][table] = [int(value) for value in cursor.fetchone()]
+    encoded = json.dumps(state, sort_keys=True).encode("utf-8")
+    return hashlib.md5(encoded).hexdigest()
+
+
+def working_checksum(db_config):
+    pool = get_pool(db_config)
+    connection = pool.acquire()
+    try:
+        with connection.cursor() as cursor:
+            return fixture_checksum(cursor)
+    finally:
+        pool.release(connection)
+
+
+def golden_checksum(db_config):
+    """Checksum recorded on the golden database, or None if there is none."""
+    connection = admin_connect(db_config)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(GOLDEN_QUERY, (golden_name(db_config),))
+            row = cursor.fetchone()
+    finally:
+        connection.close()
+    if row is None or not (row[0] or "").startswith(COMMENT_PREFIX):
+        return None
+    return row[0][len(COMMENT_PREFIX) :]
+
+
+def _seed(cursor, rows):
+    from tests.bulk_load import copy_text
+    from tests.datagen import people_generator, persons_generator
+    from tests.scale import SCALE_SEED
+
+    copy_text(
+        cursor,
+        "people",
+        ("name", "dateofbirth"),
+        people_generator(SCALE_SEED).copy_stream(rows),
+    )
+    copy_text(
+        cursor,
+        "persons",
+        (
+            "firstname",
+            "familyname",
+            "dateofbirth",
+            "placeofbirth",
+            "occupation",
+            "hobby",
+        ),
+        persons_generator(SCALE_SEED).copy_stream(rows),
+    )
+
+
+def build(db_config, seed_rows=FIXTURE_SEED_ROWS):
+    """Capture the working database as the golden template; return its checksum.
+
+    The working database must already have the baseline schema; seed_rows
+    generated rows are committed into people and persons first.
+    """
+    pool = get_pool(db_config)
+    connection = pool.acquire()
+    try:
+        with connection.cursor() as cursor:
+            problems = baseline_problems(catalog_columns(cursor))
+            if problems:
+                raise FixtureStateError(f"Not a baseline schema: {problems}")
+            if seed_rows:
+                _seed(cursor, seed_rows)
+                connection.commit()
+            checksum = fixture_checksum(cursor)
+    finally:
+        pool.release(connection)
+    # CREATE DATABASE ... TEMPLATE needs the source database to be idle.
+    pool.close_all()
+
+    golden = sql.Identifier(golden_name(db_config))
+    connection = admin_connect(db_config)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(GOLDEN_QUERY, (golden_name(db_config),))
+            if cursor.fetchone() is not None:
+                cursor.execute(
+                    sql.SQL("ALTER DATABASE {} IS_TEMPLATE false").format(golden)
+                )
+                drop_database(cursor, golden_name(db_config))
+            terminate_connections(cursor, db_config["database"])
+            clone_database(cursor, golden_name(db_config), db_config["database"])
+            # Nobody connects to the golden copy, so it cannot drift itself.
+            cursor.execute(
+                sql.SQL(
+                    "ALTER DATABASE {} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false"
+                ).format(golden)
+            )
+            cursor.execute(
+                sql.SQL("COMMENT ON DATABASE {} IS %s").format(golden),
+                (f"{COMMENT_PREFIX}{checksum}",),
+            )
+    finally:
+        connection.close()
+    return checksum
+
+
+def reset(db_config):
+    """Recreate the working database from the golden template."""
+    if golden_checksum(db_config) is None:
+        raise FixtureStateError(
+            f"No golden database {golden_name(db_config)}: run build first"
+        )
+    get_pool(db_config).close_all()
+    connection = admin_connect(db_config)
+    try:
+        with connection.cursor() as cursor:
+            terminate_connections(cursor, db_config["database"])
+            drop_database(cursor, db_config["database"])
+            clone_database(cursor, db_config["database"], golden_name(db_config))
+    finally:
+        connection.close()
+
+
+def check(db_config):
+    """Return (working checksum, golden checksum); equal means no drift."""
+    return working_checksum(db_config), golden_checksum(db_config)
+
+
+def ensure_baseline(db_config):
+    """Build the golden database if missing, or reset the working one on drift.
+
+    Returns what was done: "built", "reset" or "clean".
+    """
+    current, golden = check(db_config)
+    if golden is None:
+        build(db_config, seed_rows=0)
+        return "built"
+    if current != golden:
+        reset(db_config)
+        return "reset"
+    return "clean"
+
+
+def ensure_baseline_once(db_config):
+    """ensure_baseline, at most once per database for the whole session."""
+    if db_config["database"] in _ensured:
+        return None
+    _ensured.add(db_config["database"])
+    return ensure_baseline(db_config)
+
+
+def main(argv=None):
+    from tests.helpers import load_db_config
+
+    parser = argparse.ArgumentParser(
+        description="Manage the golden template of the test database."
+    )
+    parser.add_argument("action", choices=("build", "check", "reset", "ensure"))
+    parser.add_argument(
+        "--seed-rows",
+        type=int,
+        default=FIXTURE_SEED_ROWS,
+        help="generated rows to add to people and persons before building",
+    )
+    args = parser.parse_args(argv)
+
+    db_config = load_db_config()
+    try:
+        if args.action == "build":
+            print(f"built {golden_name(db_config)}: {build(db_config, args.seed_rows)}")
+        elif args.action == "reset":
+            reset(db_config)
+            print(f"reset {db_config['database']} from {golden_name(db_config)}")
+        elif args.action == "ensure":
+            print(ensure_baseline(db_config))
+        else:
+            current, golden = check(db_config)
+            print(f"working {current}\ngolden  {golden}")
+            return 0 if current == golden else 1
+    except FixtureStateError as error:
+        print(error, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
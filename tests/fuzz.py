@@ -0,0 +1,252 @@
+import calendar
+import os
+import random
+import re
+import time
+from collections import Counter, namedtuple
+
+FUZZ_CASES = int(os.getenv("TEST_FUZZ_CASES", "0"))
+FUZZ_BATCH_SIZE = int(os.getenv("TEST_FUZZ_BATCH_SIZE", "5000"))
+FUZZ_SEED = int(os.getenv("TEST_FUZZ_SEED", "20240101"))
+MAX_NAME_LENGTH = 255
+
+# Characters per Unicode class the name candidates are cut from. NUL is left
+# out: psycopg2 refuses it client-side, so the server never sees it. Invisible
+# characters are written as escapes.
+CHARACTER_CLASSES = {
+    "ascii": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+    "punctuation": "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~",
+    "cyrillic": "абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ",
+    "latin_accented": "àáâãäåæçèéêëìíîïðñòóôõöøùúûüýþÿĀāĂăĄąĆćŒœŠšŸŽž",
+    "cjk": "的一是不了人我在有他这中大来上国个到说们为子和你地出道也时年",
+    "emoji": "😀😃😄😁😆🙂🙃😉😊😇🥰😍🤩😘👍👎👋🤝🙏🎉🔥✨🌍🚀",
+    "combining": "\u0300\u0301\u0302\u0303\u0308\u030a\u0327\u0336",
+    "whitespace": " \t\n\r\u00a0\u2003\u3000",
+    "zero_width": "\u200b\u200c\u200d\u2060\ufeff",
+    "rtl": "אבגדהוזחטיכלמנסעפצקרשתابتثجحخدذرزسشصضطظعغفقكلمنهوي",
+}
+BOUNDARY_LENGTHS = (0, 1, 2, 127, 128, 254, 255, 256, 257, 300, 1000)
+BOUNDARY_YEARS = (0, 1, 2, 1899, 1900, 1970, 2000, 2024, 9998, 9999, 10000, 99999)
+BOUNDARY_MONTHS = (0, 1, 2, 12, 13)
+BOUNDARY_DAYS = (0, 1, 28, 29, 30, 31, 32)
+_ISO_DATE = re.compile(r"(\d{4,})-(\d{2})-(\d{2})")
+
+FUZZ_FUNCTION = """
+    CREATE OR REPLACE FUNCTION pg_temp.fuzz_people(names text[], dates text[])
+    RETURNS TABLE (item integer, error_state text)
+    LANGUAGE plpgsql AS $body$
+    BEGIN
+        FOR i IN 1 .. coalesce(array_length(names, 1), 0) LOOP
+            BEGIN
+                INSERT INTO people (name, dateofbirth)
+                VALUES (names[i], dates[i]::date);
+            EXCEPTION WHEN OTHERS THEN
+                item := i;
+                error_state := SQLSTATE;
+                RETURN NEXT;
+            END;
+        END LOOP;
+    END
+    $body$
+"""
+FUZZ_QUERY = "SELECT item, error_state FROM pg_temp.fuzz_people(%s::text[], %s::text[])"
+
+Mismatch = namedtuple("Mismatch", "name date expected_valid state")
+
+
+def expected_valid(name, date):
+    """Oracle: would a correct people table accept this (name, date) row?
+
+    Names are NOT NULL and at most MAX_NAME_LENGTH characters; like varchar,
+    trailing spaces beyond the limit are cut off rather than rejected. Dates
+    are ISO YYYY-MM-DD calendar days of years 1 to 9999.
+    """
+    if name is None or len(name.rstrip(" ")) > MAX_NAME_LENGTH:
+        return False
+    match = _ISO_DATE.fullmatch(date or "")
+    if match is None:
+        return False
+    year, month, day = map(int, match.groups())
+    return (
+        1 <= year <= 9999
+        and 1 <= month <= 12
+        and 1 <= day <= calendar.monthrange(year, month)[1]
+    )
+
+
+class CandidateGenerator:
+    """Stream (name, date) candidates around the people column boundaries.
+
+    Every class gets a long pre-shuffled string, so a name of any length is
+    one or two slices of it and generating a candidate costs no per-character
+    Python work.
+    """
+
+    def __init__(self, seed=FUZZ_SEED, pool_length=4096):
+        self._random = random.Random(seed)
+        self._classes = []
+        for characters in CHARACTER_CLASSES.values():
+            pool = "".join(self._random.choices(characters, k=pool_length))
+            self._classes.append(pool * 2)
+        self._pool_length = pool_length
+
+    def _slice(self, length):
+        pool = self._random.choice(self._classes)
+        start = self._random.randrange(self._pool_length)
+        if length > self._pool_length:
+            # Longer than a pool: repeat it, still only string operations.
+            pool *= (start + length) // len(pool) + 1
+        return pool[start : start + length]
+
+    def name(self):
+        roll = self._random.random()
+        if roll < 0.01:
+            return None
+        if roll < 0.6:
+            length = self._random.choice(BOUNDARY_LENGTHS)
+        else:
+            length = self._random.randint(0, 300)
+        if self._random.random() < 0.3 and length > 1:
+            head = self._random.randint(1, length - 1)
+            name = self._slice(head) + self._slice(length - head)
+        else:
+            name = self._slice(length)
+        if self._random.random() < 0.05:
+            name += " " * self._random.randint(1, 3)
+        return name
+
+    def date(self):
+        if self._random.random() < 0.6:
+            year = self._random.choice(BOUNDARY_YEARS)
+            month = self._random.choice(BOUNDARY_MONTHS)
+            day = self._random.choice(BOUNDARY_DAYS)
+        else:
+            year = self._random.randint(1, 9999)
+            month = self._random.randint(1, 12)
+            day = self._random.randint(1, 28)
+        return f"{year:04d}-{month:02d}-{day:02d}"
+
+    def candidates(self, count):
+        for _ in range(count):
+            yield self.name(), self.date()
+
+
+class PeopleFuzzer:
+    """Submit candidates to people in batches and compare with the oracle.
+
+    A batch is one call of a temporary PL/pgSQL function that inserts every
+    row in its own exception block (a server-side savepoint) and returns the
+    SQLSTATE of each rejected row, so a whole batch costs one round trip.
+    Inserted rows stay in the caller's transaction, which the test rolls back.
+    """
+
+    def __init__(self, cursor, batch_size=FUZZ_BATCH_SIZE):
+        self.cursor = cursor
+        self.batch_size = batch_size
+        cursor.execute(FUZZ_FUNCTION)
+
+    def submit(self, rows):
+        """{position in rows: SQLSTATE} for every row the table rejected."""
+        if not rows:
+            return {}
+        names, dates = zip(*rows)
+        self.cursor.execute(FUZZ_QUERY, (list(names), list(dates)))
+        return {item - 1: state for item, state in self.cursor.fetchall()}
+
+    def mismatches(self, rows, states=None):
+        """Rows where the table and the oracle disagree; counts SQLSTATEs."""
+        rejected = self.submit(rows)
+        if states is not None:
+            states.update(rejected.values())
+        found = []
+        for position, (name, date) in enumerate(rows):
+            valid = expected_valid(name, date)
+            if valid == (position in rejected):
+                found.append(Mismatch(name, date, valid, rejected.get(position)))
+        return found
+
+    def shrink(self, mismatch, max_rounds=50):
+        """Reduce a mismatching row to a minimal one that mismatches the same way.
+
+        Each round submits every simplification of the current row as one
+        batch and keeps the first that still mismatches with the same state.
+        """
+        current = mismatch
+        for _ in range(max_rounds):
+            candidates = list(_simplifications(current.name, current.date))
+            if not candidates:
+                break
+            for smaller in self.mismatches(candidates):
+                if (smaller.expected_valid, smaller.state) == (
+                    current.expected_valid,
+                    current.state,
+                ):
+                    current = smaller
+                    break
+            else:
+                break
+        return current
+
+    def run(self, candidates, shrink_per_kind=3):
+        """Fuzz all candidates; return a summary with shrunk mismatches."""
+        started = time.perf_counter()
+        cases = 0
+        states = Counter()
+        found = []
+        batch = []
+        for row in candidates:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                cases += len(batch)
+                found += self.mismatches(batch, states)
+                batch = []
+        if batch:
+            cases += len(batch)
+            found += self.mismatches(batch, states)
+        elapsed = time.perf_counter() - started
+
+        # Mismatches of one kind usually shrink to the same row: shrink a few.
+        minimal = []
+        shrunk_per_kind = Counter()
+        for mismatch in found:
+            kind = (mismatch.expected_valid, mismatch.state)
+            if shrunk_per_kind[kind] >= shrink_per_kind:
+                continue
+            shrunk_per_kind[kind] += 1
+            shrunk = self.shrink(mismatch)
+            if shrunk not in minimal:
+                minimal.append(shrunk)
+        return {
+            "cases": cases,
+            "seconds": elapsed,
+            "cases_per_second": cases / elapsed if elapsed else None,
+            "rejections": dict(states),
+            "mismatches": len(found),
+            "minimal": minimal,
+        }
+
+
+def _simplifications(name, date):
+    """Smaller or plainer variants of one row, most aggressive first."""
+    seen = set()
+    variants = []
+    if name:
+        length = len(name)
+        for cut in (length // 2, length - 1):
+            variants.append((name[:cut], date))
+            variants.append((name[length - cut :], date))
+        plain = "".join("a" if ch.isalnum() else ch for ch in name)
+        variants.append((plain, date))
+        if name.strip() != name:
+            variants.append((name.strip(), date))
+        variants.append(("a" * length, date))
+    match = _ISO_DATE.fullmatch(date or "")
+    if match is not None:
+        year, month, day = match.groups()
+        variants.append((name, f"2000-{month}-{day}"))
+        variants.append((name, f"{year}-01-{day}"))
+        variants.append((name, f"{year}-{month}-01"))
+    for variant in variants:
+        if variant != (name, date) and variant not in seen:
+            seen.add(variant)
+            yield variant
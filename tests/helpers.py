@@ -1,58 +1,326 @@
+import contextlib
+import functools
 import os
 import unittest
 
 import psycopg2
 
+from tests.bulk_load import PAGE_SIZE, copy_rows, copy_text, insert_rows_paged
+from tests.catalog_cache import catalog_cache
+from tests.connection_pool import get_pool
+from tests.datagen import people_generator
+from tests.fixture_state import FIXTURE_RESET, ensure_baseline_once
+from tests.io_stats import io_stats
+from tests.negative_cases import run_negative_cases
+from tests.query_stats import query_stats
+from tests.scale import SCALE_SEED
+from tests.schema_snapshot import diff_snapshots, take_snapshot
+from tests.verification import (
+    STREAM_ITERSIZE,
+    column_types,
+    iso_dates,
+    missing_table_rows,
+    stream_missing_rows,
+)
+
+ISOLATION_MODES = ("connection", "savepoint")
+TEST_SAVEPOINT = "test_case"
+WORKER_DATABASE_ENV = "TEST_WORKER_DATABASE"
+
+
+@functools.lru_cache(maxsize=None)
+def _session_db_config():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    env = os.getenv("TEST_ENV", "local")
+    if env == "local":
+        return {
+            "host": os.getenv("LOCAL_DB_HOST"),
+            "database": os.getenv("LOCAL_DB_NAME"),
+            "user": os.getenv("LOCAL_DB_USER"),
+            "password": os.getenv("LOCAL_DB_PASSWORD"),
+            "port": os.getenv("LOCAL_DB_PORT"),
+        }
+    elif env == "remote_for_check":
+        return {
+            "host": os.getenv("REMOTE_FOR_CHECK_DB_HOST"),
+            "database": os.getenv("REMOTE_FOR_CHECK_DB_NAME"),
+            "user": os.getenv("REMOTE_FOR_CHECK_DB_USER"),
+            "password": os.getenv("REMOTE_FOR_CHECK_DB_PASSWORD"),
+            "port": os.getenv("REMOTE_FOR_CHECK_DB_PORT"),
+        }
+    else:
+        raise ValueError(f"Unknown environment: {env}")
+
+
+def load_db_config():
+    """Load configuration based on environment variable, once per session.
+
+    tests/.env is read on the first call; every call returns a fresh copy.
+    """
+    return dict(_session_db_config())
+
+
+def resolve_db_config():
+    """Load the configuration and route it to this worker's database, if any."""
+    db_config = load_db_config()
+    worker_database = os.getenv(WORKER_DATABASE_ENV)
+    if worker_database:
+        db_config["database"] = worker_database
+    return db_config
+
+
+class SavepointConnection:
+    """Connection proxy whose rollback only undoes the current test's savepoint."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def rollback(self):
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {TEST_SAVEPOINT}")
+
+    def commit(self):
+        raise RuntimeError(
+            "Tests in savepoint isolation share one transaction and cannot commit."
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
 
 class BaseClassForDateBase(unittest.TestCase):
-    """Base class for setting up and tearing down database connections."""
+    """Base class for borrowing and returning pooled database connections.
+
+    In "connection" isolation every test borrows its own connection and the
+    transaction is rolled back in tearDown. In "savepoint" isolation the class
+    holds one transaction and every test runs between SAVEPOINT and
+    ROLLBACK TO SAVEPOINT, which also undoes DDL and releases its locks.
+    If that transaction is lost (a failed setUp or rollback), whatever
+    setUpClass put in it is gone too, so the remaining tests of the class
+    fail instead of running on a fresh connection.
+    The mode comes from the `isolation` attribute or the TEST_ISOLATION
+    environment variable.
+
+    With TEST_IO_REPORT set, table scan/tuple counters (and buffer counters,
+    if pg_stat_statements is available) are diffed around every test and
+    kept in `self.io_stats` and the report.
+
+    Classes that list tables in `schema_tables` get a pg_catalog snapshot of
+    them taken once, before their first test, to diff DDL results against.
+
+    With TEST_FIXTURE_RESET set, the first class of the session compares the
+    database with its golden template (tests/fixture_state.py) and recreates
+    it from the template if it has drifted.
+
+    With TEST_CATALOG_CACHE set to a file, catalog_lookup() answers repeated
+    information_schema precondition queries from that file until the schema
+    changes (tests/catalog_cache.py).
+    """
+
+    isolation = None
+    schema_tables = ()
+    _class_connection = None
+    _class_broken = None
+    _schema_baseline = None
+    _column_types = None
 
     @classmethod
     def setUpClass(cls):
         """Load configuration based on environment variable."""
-        env = os.getenv("TEST_ENV", "local")
-        if env == "local":
-            cls.db_config = {
-                "host": os.getenv("LOCAL_DB_HOST"),
-                "database": os.getenv("LOCAL_DB_NAME"),
-                "user": os.getenv("LOCAL_DB_USER"),
-                "password": os.getenv("LOCAL_DB_PASSWORD"),
-                "port": os.getenv("LOCAL_DB_PORT"),
-            }
-        elif env == "remote_for_check":
-            cls.db_config = {
-                "host": os.getenv("REMOTE_FOR_CHECK_DB_HOST"),
-                "database": os.getenv("REMOTE_FOR_CHECK_DB_NAME"),
-                "user": os.getenv("REMOTE_FOR_CHECK_DB_USER"),
-                "password": os.getenv("REMOTE_FOR_CHECK_DB_PASSWORD"),
-                "port": os.getenv("REMOTE_FOR_CHECK_DB_PORT"),
-            }
-        else:
-            raise ValueError(f"Unknown environment: {env}")
+        query_stats.current_test = f"{cls.__module__}.{cls.__qualname__}.setUpClass"
+        if FIXTURE_RESET:
+            # Keyed by the main database: parallel workers inherit the check.
+            ensure_baseline_once(load_db_config())
+        cls.db_config = resolve_db_config()
+        cls._isolation = cls.isolation or os.getenv("TEST_ISOLATION", "connection")
+        if cls._isolation not in ISOLATION_MODES:
+            raise ValueError(f"Unknown isolation mode: {cls._isolation}")
+        cls._class_connection = None
+        cls._class_broken = None
+        cls._schema_baseline = None
+        cls._column_types = {}
 
-    def setUp(self):
-        """Connect to the database using parameters from the selected environment."""
-        try:
-            self.connection = psycopg2.connect(
-                host=self.db_config["host"],
-                user=self.db_config["user"],
-                password=self.db_config["password"],
-                database=self.db_config["database"],
-                port=self.db_config["port"],
-            )
-            self.cursor = self.connection.cursor()
-            self.connection.autocommit = False
+    @classmethod
+    def tearDownClass(cls):
+        """Roll back the shared class transaction, if there is one."""
+        cls._release_class_connection()
 
-            self.cursor.execute("SELECT 1")
-            result = self.cursor.fetchone()
-            if result is None or result[0] != 1:
-                raise Exception("Failed to connect to the database.")
+    @classmethod
+    def _release_class_connection(cls):
+        if cls._class_connection is not None:
+            get_pool(cls.db_config).release(cls._class_connection)
+            cls._class_connection = None
+
+    @classmethod
+    def _break_class_transaction(cls, reason):
+        """Give back the class connection whose transaction failed midway."""
+        if cls._class_connection is not None:
+            cls._class_broken = reason
+            cls._release_class_connection()
+
+    @classmethod
+    @contextlib.contextmanager
+    def seed_people(cls, rows, seed=SCALE_SEED):
+        """Load `rows` generated people rows into the class transaction.
+
+        The table is then analyzed, so plans see the seeded row count.
+        For setUpClass of savepoint-isolated classes: the rows last until
+        tearDownClass rolls the class transaction back. Yields a cursor for
+        further class setup; if seeding or that block fails, the connection is
+        returned before the error propagates, as tearDownClass will not run.
+        """
+        if cls._isolation != "savepoint":
+            raise ValueError("seed_people needs savepoint isolation")
+        cls._class_connection = get_pool(cls.db_config).acquire()
+        try:
+            with cls._class_connection.cursor() as cursor:
+                copy_text(
+                    cursor,
+                    "people",
+                    ("name", "dateofbirth"),
+                    people_generator(seed).copy_stream(rows),
+                )
+                cursor.execute("ANALYZE people")
+                yield cursor
+        except BaseException:
+            cls._release_class_connection()
+            raise
 
+    def setUp(self):
+        """Borrow a connection to the database of the selected environment."""
+        query_stats.current_test = self.id()
+        if self._isolation == "savepoint" and type(self)._class_broken:
+            self.fail(
+                "The class transaction was rolled back by an earlier failure, "
+                f"together with its setUpClass data: {type(self)._class_broken}"
+            )
+        try:
+            if self._isolation == "savepoint":
+                cls = type(self)
+                if cls._class_connection is None:
+                    cls._class_connection = get_pool(self.db_config).acquire()
+                self.connection = SavepointConnection(cls._class_connection)
+                self.cursor = self.connection.cursor()
+                self.cursor.execute(f"SAVEPOINT {TEST_SAVEPOINT}")
+            else:
+                self.connection = get_pool(self.db_config).acquire()
+                self.cursor = self.connection.cursor()
+            if self.schema_tables and type(self)._schema_baseline is None:
+                type(self)._schema_baseline = take_snapshot(
+                    self.cursor, self.schema_tables
+                )
+            if io_stats.enabled:
+                self._io_before = io_stats.snapshot(self.cursor)
         except (Exception, psycopg2.DatabaseError) as error:
+            self._release_failed_setup(error)
             self.fail(f"Database connection failed: {error}")
 
+    def _release_failed_setup(self, error):
+        """Give back what a failed setUp borrowed: tearDown will not run."""
+        cursor = self.__dict__.pop("cursor", None)
+        if cursor is not None and not cursor.closed:
+            cursor.close()
+        if self._isolation == "savepoint":
+            type(self)._break_class_transaction(f"setUp of {self.id()}: {error}")
+        else:
+            connection = self.__dict__.pop("connection", None)
+            if connection is not None:
+                get_pool(self.db_config).release(connection)
+
     def tearDown(self):
-        """Rollback transactions and close connections after each test."""
-        self.connection.rollback()
-        self.cursor.close()
-        self.connection.close()
+        """Close the cursor and undo everything the test did."""
+        try:
+            if io_stats.enabled:
+                self.io_stats = io_stats.record(
+                    self.id(), self._io_before, io_stats.snapshot(self.cursor)
+                )
+        finally:
+            self.cursor.close()
+            if self._isolation != "savepoint":
+                get_pool(self.db_config).release(self.connection)
+            else:
+                self._rollback_test_savepoint()
+            query_stats.current_test = None
+
+    def _rollback_test_savepoint(self):
+        cls = type(self)
+        try:
+            with cls._class_connection.cursor() as cursor:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {TEST_SAVEPOINT}")
+                cursor.execute(f"RELEASE SAVEPOINT {TEST_SAVEPOINT}")
+        except psycopg2.Error as error:
+            cls._break_class_transaction(f"rollback after {self.id()}: {error}")
+
+    def bulk_load(self, table, columns, rows, method="copy", page_size=PAGE_SIZE):
+        """Load rows into table with COPY, or with paged INSERT ... VALUES.
+
+        Returns the number of rows loaded. The "values" method is the fallback
+        for setups where COPY is unavailable and sends page_size rows per query.
+        """
+        if method == "copy":
+            return copy_rows(self.cursor, table, columns, rows)
+        elif method == "values":
+            return insert_rows_paged(self.cursor, table, columns, rows, page_size)
+        else:
+            raise ValueError(f"Unknown bulk load method: {method}")
+
+    def catalog_lookup(self, query, params=None):
+        """Rows of a read-only catalog query, cached on disk by schema version.
+
+        With TEST_CATALOG_CACHE unset this is execute plus fetchall.
+        """
+        if not catalog_cache.enabled:
+            self.cursor.execute(query, params)
+            return self.cursor.fetchall()
+        return catalog_cache.fetchall(self.cursor, query, params)
+
+    def assertRowsPresent(
+        self,
+        query,
+        expected,
+        params=None,
+        normalize=iso_dates,
+        itersize=STREAM_ITERSIZE,
+    ):
+        """Assert that query yields every expected row, streaming the result."""
+        missing = stream_missing_rows(
+            self.connection, query, expected, params, normalize, itersize
+        )
+        self.assertFalse(missing, f"Rows not found in records: {sorted(missing)}")
+
+    def assertRowsInTable(self, table, columns, expected, types=None):
+        """Assert that table holds every expected row, checked in one query.
+
+        Column types are looked up once per class unless types is given.
+        """
+        if types is None:
+            key = (table, tuple(columns))
+            types = type(self)._column_types.get(key)
+            if types is None:
+                types = type(self)._column_types[key] = column_types(
+                    self.cursor, table, columns
+                )
+        missing = missing_table_rows(self.cursor, table, columns, types, expected)
+        self.assertFalse(missing, f"Rows not found in {table}: {missing}")
+
+    def assertStatementsFail(self, cases):
+        """Assert that every NegativeCase fails with its expected error.
+
+        All cases share this test's connection, each under a savepoint; every
+        mismatch is reported as its own subTest.
+        """
+        for case, error in run_negative_cases(self.cursor, cases):
+            with self.subTest(case=case.name):
+                self.assertTrue(case.matches(error), case.describe(error))
+
+    def schema_baseline(self):
+        """Return the class snapshot of schema_tables, keyed by table OID."""
+        return type(self)._schema_baseline
+
+    def schema_diff(self):
+        """Diff the current schema against the class baseline in one query."""
+        baseline = self.schema_baseline()
+        current = take_snapshot(self.cursor, self.schema_tables, baseline)
+        return diff_snapshots(baseline, current)
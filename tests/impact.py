@@ -0,0 +1,322 @@
+# выбор тестов по изменениям схемы: record запускает тесты и сохраняет, какие
+# таблицы и столбцы затрагивает каждый тест; run запускает только тесты,
+# затронутые изменениями схемы или исходников с момента последней записи
+# ```python -m tests.impact record [<модуль или путь> ...]
+# python -m tests.impact run [--list] [<модуль или путь> ...]```
+# файл индекса: TEST_IMPACT_INDEX (по умолчанию impact_index.json)
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import sys
+import unittest
+
+IMPACT_INDEX = os.getenv("TEST_IMPACT_INDEX", "impact_index.json")
+ALL_COLUMNS = "*"
+SETUP_CLASS_SUFFIX = ".setUpClass"
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CATALOG_QUERY = """
+    SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod)
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_catalog.pg_attribute a
+        ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+    ORDER BY c.relname, a.attnum
+"""
+
+# Identifiers and string literal contents alike: catalog lookups name tables
+# and columns in literals ('persons', 'hobby') rather than as identifiers.
+_WORD = re.compile(r"[a-z_][a-z0-9_$]*")
+
+
+@functools.lru_cache(maxsize=4096)
+def statement_words(statement):
+    """Lowercased words of a statement and whether it selects every column."""
+    statement = statement.lower()
+    return frozenset(_WORD.findall(statement)), "*" in statement
+
+
+def _string_params(params):
+    if isinstance(params, dict):
+        params = params.values()
+    elif not isinstance(params, (tuple, list)):
+        return ()
+    return [value.lower() for value in params if isinstance(value, str)]
+
+
+class ImpactRecorder:
+    """Words of the statements each test sends, collected by the harness cursor.
+
+    Words are only resolved to tables and columns when the index is built,
+    against one catalog snapshot, so recording costs a cached regex per
+    statement text.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.tests = {}
+
+    def record(self, test, statement, params=None):
+        words, all_columns = statement_words(statement)
+        entry = self.tests.setdefault(test or "<no test>", [set(), False])
+        entry[0] |= words
+        entry[0].update(_string_params(params))
+        entry[1] = entry[1] or all_columns
+
+    def test_words(self):
+        """(test id, words, all_columns) per test, with its class's setUpClass."""
+        class_words = {
+            test[: -len(SETUP_CLASS_SUFFIX)]: entry
+            for test, entry in self.tests.items()
+            if test.endswith(SETUP_CLASS_SUFFIX)
+        }
+        for test, (words, all_columns) in self.tests.items():
+            if test.endswith(SETUP_CLASS_SUFFIX) or test == "<no test>":
+                continue
+            class_entry = class_words.get(test.rsplit(".", 1)[0])
+            if class_entry is not None:
+                words = words | class_entry[0]
+                all_columns = all_columns or class_entry[1]
+            yield test, words, all_columns
+
+    def dependencies(self, catalog):
+        """{test id: {table: sorted columns or "*"}} resolved against catalog.
+
+        Statements from setUpClass count for every test of the class. A table
+        mentioned without any of its columns, or next to a "*", depends on all
+        of its columns.
+        """
+        result = {}
+        for test, words, all_columns in self.test_words():
+            tables = {}
+            for table, columns in catalog.items():
+                if table not in words:
+                    continue
+                used = sorted(words.intersection(columns))
+                tables[table] = ALL_COLUMNS if all_columns or not used else used
+            result[test] = tables
+        return result
+
+    def unresolved(self, catalog):
+        """{test id: sorted words that name no table or column in catalog}.
+
+        Kept so a test that refers to a table missing at record time (say, to
+        check that it does not exist) is selected once such a table appears.
+        """
+        known = set(catalog)
+        for columns in catalog.values():
+            known.update(columns)
+        return {
+            test: sorted(words - known) for test, words, _ in self.test_words()
+        }
+
+
+impact_recorder = ImpactRecorder()
+
+
+def catalog_snapshot(cursor, schema="public"):
+    """{table: {column: type}} for every table of schema."""
+    cursor.execute(CATALOG_QUERY, (schema,))
+    catalog = {}
+    for table, column, column_type in cursor.fetchall():
+        catalog.setdefault(table, {})[column] = column_type
+    return catalog
+
+
+def diff_catalogs(before, after):
+    """{table: changed column names, or "*" if the table appeared or vanished}."""
+    changed = {}
+    for table in before.keys() | after.keys():
+        old = before.get(table)
+        new = after.get(table)
+        if old is None or new is None:
+            changed[table] = ALL_COLUMNS
+            continue
+        columns = {
+            column
+            for column in old.keys() | new.keys()
+            if old.get(column) != new.get(column)
+        }
+        if columns:
+            changed[table] = columns
+    return changed
+
+
+def source_hashes(directory=TESTS_DIR):
+    """{module file name: sha1} of the Python files in the tests package."""
+    hashes = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(".py"):
+            with open(os.path.join(directory, file_name), "rb") as source:
+                hashes[file_name] = hashlib.sha1(source.read()).hexdigest()
+    return hashes
+
+
+def _is_test_module(file_name):
+    return file_name.startswith("test_")
+
+
+def affected_tests(index, test_ids, catalog, hashes):
+    """The test ids to run, each with the reason it was selected.
+
+    A test runs if it is missing from the index, failed last time, its
+    module changed, any harness module changed, it touches a table or
+    column that changed, or it named a table that did not exist then and
+    does now.
+    """
+    changed_sources = {
+        file_name
+        for file_name in index["sources"].keys() | hashes.keys()
+        if index["sources"].get(file_name) != hashes.get(file_name)
+    }
+    harness_changed = sorted(f for f in changed_sources if not _is_test_module(f))
+    changed_schema = diff_catalogs(index["catalog"], catalog)
+    new_tables = catalog.keys() - index["catalog"].keys()
+    failed = set(index["failed"])
+
+    selected = {}
+    for test_id in test_ids:
+        module_file = test_id.split(".")[1] + ".py"
+        dependencies = index["tests"].get(test_id)
+        if harness_changed:
+            selected[test_id] = f"harness changed: {', '.join(harness_changed)}"
+        elif dependencies is None:
+            selected[test_id] = "not in the index"
+        elif test_id in failed:
+            selected[test_id] = "failed in the last run"
+        elif module_file in changed_sources:
+            selected[test_id] = f"{module_file} changed"
+        else:
+            appeared = new_tables.intersection(index["unresolved"].get(test_id, ()))
+            reason = _schema_reason(dependencies, changed_schema)
+            if appeared:
+                selected[test_id] = f"{', '.join(sorted(appeared))} appeared"
+            elif reason:
+                selected[test_id] = reason
+    return selected
+
+
+def _schema_reason(dependencies, changed_schema):
+    for table, columns in dependencies.items():
+        changed = changed_schema.get(table)
+        if changed is None:
+            continue
+        if changed == ALL_COLUMNS or columns == ALL_COLUMNS:
+            return f"{table} changed"
+        overlap = changed.intersection(columns)
+        if overlap:
+            return f"{table}({', '.join(sorted(overlap))}) changed"
+    return None
+
+
+def suite_test_ids(suite):
+    ids = []
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            ids += suite_test_ids(test)
+        else:
+            ids.append(test.id())
+    return ids
+
+
+def read_index(path=IMPACT_INDEX):
+    with open(path, encoding="utf-8") as index_file:
+        return json.load(index_file)
+
+
+def write_index(index, path=IMPACT_INDEX):
+    with open(path, "w", encoding="utf-8") as index_file:
+        json.dump(index, index_file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def _current_catalog():
+    from tests.connection_pool import get_pool
+    from tests.helpers import resolve_db_config
+
+    pool = get_pool(resolve_db_config())
+    connection = pool.acquire()
+    try:
+        with connection.cursor() as cursor:
+            return catalog_snapshot(cursor)
+    finally:
+        pool.release(connection)
+
+
+def _run_recorded(suite, previous=None):
+    """Run suite with recording on and fold the result into a new index.
+
+    Failed tests are kept in the index and selected again by every run until
+    they pass, so advancing the catalog and sources never hides them.
+    """
+    impact_recorder.enabled = True
+    impact_recorder.tests.clear()
+    result = unittest.TextTestRunner(verbosity=1).run(suite)
+    impact_recorder.enabled = False
+
+    catalog = _current_catalog()
+    tests = dict(previous["tests"]) if previous else {}
+    tests.update(impact_recorder.dependencies(catalog))
+    unresolved = dict(previous["unresolved"]) if previous else {}
+    unresolved.update(impact_recorder.unresolved(catalog))
+    ran = set(suite_test_ids(suite))
+    failed = set(previous["failed"]) - ran if previous else set()
+    failed.update(test.id() for test, _ in result.failures + result.errors)
+    failed.update(test.id() for test in result.unexpectedSuccesses)
+    write_index(
+        {
+            "catalog": catalog,
+            "sources": source_hashes(),
+            "tests": tests,
+            "unresolved": unresolved,
+            "failed": sorted(failed),
+        }
+    )
+    return result.wasSuccessful()
+
+
+def main(argv=None):
+    from tests.parallel_runner import DEFAULT_PATTERN, load_suite
+
+    parser = argparse.ArgumentParser(
+        description="Record which tables each test touches, or run only the "
+        "tests affected by schema and source changes since the last record."
+    )
+    parser.add_argument("action", choices=("record", "run"))
+    parser.add_argument("targets", nargs="*", help="test modules or files")
+    parser.add_argument("-p", "--pattern", default=DEFAULT_PATTERN)
+    parser.add_argument(
+        "--list", action="store_true", help="only print the selected tests"
+    )
+    args = parser.parse_args(argv)
+
+    suite = load_suite(args.targets, args.pattern)
+    if args.action == "record" or not os.path.exists(IMPACT_INDEX):
+        if args.action == "run":
+            print(f"{IMPACT_INDEX} not found, running and recording everything")
+        if args.list:
+            print("\n".join(suite_test_ids(suite)))
+            return 0
+        return 0 if _run_recorded(suite) else 1
+
+    index = read_index()
+    selected = affected_tests(
+        index, suite_test_ids(suite), _current_catalog(), source_hashes()
+    )
+    for test_id, reason in selected.items():
+        print(f"{test_id}: {reason}")
+    if args.list:
+        return 0
+    if not selected:
+        print("No tests affected")
+        return 0
+    loader = unittest.TestLoader()
+    return 0 if _run_recorded(loader.loadTestsFromNames(selected), index) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
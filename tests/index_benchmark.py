@@ -0,0 +1,155 @@
+# сводная таблица по отчёту бенчмарка индексов people.name:
+# ```python -m tests.index_benchmark index_report.json```
+
+import argparse
+import json
+import sys
+import time
+
+from psycopg2 import sql
+
+from tests.plans import explain, plan_shape
+from tests.scale import summarize, time_call
+
+INDEX_NAME = "people_benchmark_idx"
+INDEX_STRATEGIES = {
+    "none": None,
+    "btree_name": "CREATE INDEX {} ON people (name)",
+    "btree_name_dateofbirth": "CREATE INDEX {} ON people (name, dateofbirth)",
+    "text_pattern_ops": "CREATE INDEX {} ON people (name text_pattern_ops)",
+    "hash_name": "CREATE INDEX {} ON people USING hash (name)",
+}
+
+LOOKUP_QUERY = "SELECT * FROM people WHERE name = %s"
+PREFIX_QUERY = "SELECT * FROM people WHERE name LIKE %s"
+ORDERED_QUERY = "SELECT name, dateofbirth FROM people ORDER BY name, dateofbirth"
+EXISTING_INDEXES_QUERY = """
+    SELECT indexname, indexdef FROM pg_indexes
+    WHERE schemaname = 'public' AND tablename = 'people'
+    ORDER BY indexname
+"""
+SAMPLE_NAMES_QUERY = "SELECT name FROM people TABLESAMPLE SYSTEM (1) LIMIT %s"
+SUMMARY_COLUMNS = (
+    ("strategy", "{}"),
+    ("build_s", "{:.3f}"),
+    ("size_mb", "{:.1f}"),
+    ("lookup_p50_ms", "{:.3f}"),
+    ("lookup_p95_ms", "{:.3f}"),
+    ("prefix_p50_ms", "{:.3f}"),
+    ("ordered_rows_s", "{:.0f}"),
+)
+
+
+def existing_indexes(cursor):
+    cursor.execute(EXISTING_INDEXES_QUERY)
+    return dict(cursor.fetchall())
+
+
+def sample_names(cursor, count):
+    """Up to count names that exist in people, repeated to fill count."""
+    cursor.execute(SAMPLE_NAMES_QUERY, (count,))
+    names = [name for (name,) in cursor.fetchall()]
+    if not names:
+        cursor.execute("SELECT name FROM people LIMIT %s", (count,))
+        names = [name for (name,) in cursor.fetchall()]
+    return [names[number % len(names)] for number in range(count)] if names else []
+
+
+def build_index(cursor, strategy):
+    """Create the strategy's index; return (seconds, bytes), zeros for "none"."""
+    template = INDEX_STRATEGIES[strategy]
+    if template is None:
+        return 0.0, 0
+    statement = sql.SQL(template).format(sql.Identifier(INDEX_NAME))
+    seconds = time_call(cursor.execute, statement)
+    cursor.execute("ANALYZE people")
+    cursor.execute("SELECT pg_relation_size(%s::regclass)", (INDEX_NAME,))
+    return seconds, cursor.fetchone()[0]
+
+
+def time_lookups(cursor, query, params_list):
+    latencies = []
+    for params in params_list:
+        latencies.append(time_call(cursor.execute, query, params))
+        cursor.fetchall()
+    return summarize(latencies)
+
+
+def time_ordered_scan(connection, itersize=10000):
+    """Stream the whole table in ORDER BY name, dateofbirth; return rows/s."""
+    with connection.cursor(name="index_benchmark_scan") as cursor:
+        cursor.itersize = itersize
+        started = time.perf_counter()
+        cursor.execute(ORDERED_QUERY)
+        rows = sum(1 for _ in cursor)
+        elapsed = time.perf_counter() - started
+    return {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed}
+
+
+def measure_strategy(cursor, connection, strategy, names, ordered_scan=True):
+    """Build one strategy's index and time lookups and scans against it.
+
+    The caller is expected to run this under a savepoint and roll the index
+    back afterwards, so strategies never see each other's indexes.
+    """
+    build_seconds, index_bytes = build_index(cursor, strategy)
+    prefixes = [(name[:3].replace("%", "").replace("_", "") + "%",) for name in names]
+    result = {
+        "build_seconds": build_seconds,
+        "index_bytes": index_bytes,
+        "lookup": time_lookups(cursor, LOOKUP_QUERY, [(name,) for name in names]),
+        "prefix": time_lookups(cursor, PREFIX_QUERY, prefixes),
+        "plans": {
+            "lookup": plan_shape(explain(cursor, LOOKUP_QUERY, (names[0],))),
+            "prefix": plan_shape(explain(cursor, PREFIX_QUERY, prefixes[0])),
+            "ordered": plan_shape(explain(cursor, ORDERED_QUERY + " LIMIT 1000")),
+        },
+    }
+    if ordered_scan:
+        result["ordered_scan"] = time_ordered_scan(connection)
+    return result
+
+
+def summary_rows(report):
+    for strategy, result in report["operations"].items():
+        ordered = result.get("ordered_scan") or {}
+        yield (
+            strategy,
+            result["build_seconds"],
+            result["index_bytes"] / (1 << 20),
+            result["lookup"]["p50_ms"],
+            result["lookup"]["p95_ms"],
+            result["prefix"]["p50_ms"],
+            ordered.get("rows_per_second", 0.0),
+        )
+
+
+def summary_table(report):
+    """Fixed-width text table, one line per strategy."""
+    titles, templates = zip(*SUMMARY_COLUMNS)
+    cells = [list(titles)]
+    for row in summary_rows(report):
+        cells.append([tmpl.format(value) for tmpl, value in zip(templates, row)])
+    widths = [max(len(cell) for cell in column) for column in zip(*cells)]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if column == 0 else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(line, widths))
+        )
+        for line in cells
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Print the summary table of an index benchmark report."
+    )
+    parser.add_argument("report", help="JSON report written by the benchmark")
+    args = parser.parse_args(argv)
+    with open(args.report, encoding="utf-8") as report_file:
+        print(summary_table(json.load(report_file)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
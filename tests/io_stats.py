@@ -0,0 +1,173 @@
+import atexit
+import json
+import os
+import statistics
+
+import psycopg2
+from psycopg2 import extensions
+
+IO_REPORT = os.getenv("TEST_IO_REPORT")
+IO_OUTLIER_FACTOR = float(os.getenv("TEST_IO_OUTLIER_FACTOR", "10"))
+IO_OUTLIER_FLOOR = int(os.getenv("TEST_IO_OUTLIER_FLOOR", "1000"))
+FULL_SCAN_FRACTION = 0.9
+
+TABLE_COUNTERS = (
+    "seq_scan",
+    "seq_tup_read",
+    "idx_scan",
+    "idx_tup_fetch",
+    "n_tup_ins",
+    "n_tup_upd",
+    "n_tup_del",
+)
+STATEMENT_COUNTERS = ("calls", "rows", "shared_blks_hit", "shared_blks_read")
+
+# pg_stat_xact_* shows the current transaction's counts before they are
+# flushed to pg_stat_user_tables, so it works inside the test's transaction.
+TABLES_QUERY = """
+    /* io_stats */
+    SELECT x.relname, x.seq_scan, x.seq_tup_read, COALESCE(x.idx_scan, 0),
+           COALESCE(x.idx_tup_fetch, 0), x.n_tup_ins, x.n_tup_upd, x.n_tup_del,
+           t.n_live_tup
+    FROM pg_stat_xact_user_tables x
+    JOIN pg_stat_user_tables t USING (relid)
+"""
+STATEMENTS_AVAILABLE_QUERY = "SELECT to_regclass('pg_stat_statements') IS NOT NULL"
+STATEMENTS_SAVEPOINT = "io_stats"
+# Unlike pg_statio_*, pg_stat_statements block counters are updated as each
+# statement finishes, so they can be diffed mid-transaction.
+STATEMENTS_QUERY = """
+    /* io_stats */
+    SELECT COALESCE(SUM(calls), 0), COALESCE(SUM(rows), 0),
+           COALESCE(SUM(shared_blks_hit), 0), COALESCE(SUM(shared_blks_read), 0)
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND query NOT LIKE '%/* io_stats */%'
+"""
+
+
+class IoStats:
+    """Per-test table scan, tuple and buffer deltas, snapshotted around tests."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.tests = {}
+        self._statements_available = {}
+
+    def snapshot(self, cursor):
+        """Counters visible to cursor's transaction, or None if it has failed."""
+        connection = cursor.connection
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_INERROR:
+            return None
+        cursor.execute(TABLES_QUERY)
+        tables = {
+            row[0]: dict(zip(TABLE_COUNTERS + ("n_live_tup",), row[1:]))
+            for row in cursor.fetchall()
+        }
+        statements = None
+        if self._has_statements(cursor):
+            cursor.execute(STATEMENTS_QUERY)
+            statements = dict(zip(STATEMENT_COUNTERS, cursor.fetchone()))
+        return {"tables": tables, "statements": statements}
+
+    def _has_statements(self, cursor):
+        database = cursor.connection.info.dbname
+        available = self._statements_available.get(database)
+        if available is None:
+            cursor.execute(STATEMENTS_AVAILABLE_QUERY)
+            available = cursor.fetchone()[0]
+            if available:
+                # The view exists without the library preloaded, and then
+                # reading it fails: probe under a savepoint.
+                cursor.execute(f"SAVEPOINT {STATEMENTS_SAVEPOINT}")
+                try:
+                    cursor.execute(STATEMENTS_QUERY)
+                except psycopg2.Error:
+                    available = False
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {STATEMENTS_SAVEPOINT}")
+                cursor.execute(f"RELEASE SAVEPOINT {STATEMENTS_SAVEPOINT}")
+            self._statements_available[database] = available
+        return available
+
+    def record(self, test, before, after):
+        """Store the delta between two snapshots for test and return it."""
+        if before is None or after is None:
+            return None
+        tables = {}
+        for name, counters in after["tables"].items():
+            previous = before["tables"].get(name, {})
+            if any(counters[c] < previous.get(c, 0) for c in TABLE_COUNTERS):
+                # The test rolled back and started a new transaction.
+                previous = {}
+            delta = {
+                counter: int(counters[counter]) - int(previous.get(counter, 0))
+                for counter in TABLE_COUNTERS
+            }
+            if any(delta.values()):
+                delta["n_live_tup"] = counters["n_live_tup"]
+                tables[name] = delta
+        statements = None
+        if before["statements"] is not None and after["statements"] is not None:
+            statements = {
+                counter: int(after["statements"][counter])
+                - int(before["statements"][counter])
+                for counter in STATEMENT_COUNTERS
+            }
+        entry = self.tests[test] = {"tables": tables, "statements": statements}
+        return entry
+
+    def outliers(self, factor=IO_OUTLIER_FACTOR, floor=IO_OUTLIER_FLOOR):
+        """Tests that scan whole tables or touch far more than the median test."""
+        tuples = {test: _tuples_read(entry) for test, entry in self.tests.items()}
+        blocks = {
+            test: _blocks(entry)
+            for test, entry in self.tests.items()
+            if entry["statements"] is not None
+        }
+        found = []
+        for test, entry in self.tests.items():
+            reasons = []
+            for table, delta in entry["tables"].items():
+                live = delta["n_live_tup"] or 0
+                if live and delta["seq_tup_read"] >= FULL_SCAN_FRACTION * live:
+                    reasons.append(
+                        f"full scan of {table} ({delta['seq_tup_read']} tuples)"
+                    )
+            for metric, values in (("tuples read", tuples), ("blocks", blocks)):
+                if test not in values or not values:
+                    continue
+                median = statistics.median(values.values())
+                if values[test] >= floor and values[test] > factor * max(median, 1):
+                    reasons.append(f"{metric} {values[test]} vs median {median}")
+            if reasons:
+                found.append({"test": test, "reasons": reasons})
+        return found
+
+    def report(self):
+        return {"tests": self.tests, "outliers": self.outliers()}
+
+    def write_report(self, path):
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.report(), report_file, ensure_ascii=False, indent=2)
+
+
+def _tuples_read(entry):
+    return sum(
+        delta["seq_tup_read"] + delta["idx_tup_fetch"]
+        for delta in entry["tables"].values()
+    )
+
+
+def _blocks(entry):
+    statements = entry["statements"]
+    return statements["shared_blks_hit"] + statements["shared_blks_read"]
+
+
+io_stats = IoStats(enabled=bool(IO_REPORT))
+
+
+@atexit.register
+def _write_io_report():
+    if io_stats.enabled and io_stats.tests:
+        io_stats.write_report(IO_REPORT)
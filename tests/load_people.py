@@ -0,0 +1,212 @@
+# конкурентная нагрузка на таблицу people (вставка, обновление, удаление по index);
+# строки сценария фиксируются в базе и удаляются в конце, поэтому лучше
+# запускать на отдельной базе данных
+# ```python -m tests.load_people --operations 5000 --concurrency 500```
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+
+import psycopg2
+
+from tests.aio import AsyncConnectionPool
+from tests.helpers import resolve_db_config
+from tests.scale import new_report, summarize
+
+SERIALIZATION_FAILURE = "40001"
+DEADLOCK_DETECTED = "40P01"
+ISOLATION_LEVELS = ("read committed", "repeatable read", "serializable")
+DEFAULT_MIX = {"insert": 0.4, "update": 0.4, "delete": 0.2}
+
+
+class PeopleLoad:
+    """Concurrent insert/update/delete-by-index traffic against people."""
+
+    def __init__(
+        self,
+        pool,
+        isolation_level="read committed",
+        rows_per_update=2,
+        mix=DEFAULT_MIX,
+        seed=None,
+    ):
+        if isolation_level not in ISOLATION_LEVELS:
+            raise ValueError(f"Unknown isolation level: {isolation_level}")
+        self.pool = pool
+        self.isolation_level = isolation_level
+        self.rows_per_update = rows_per_update
+        self.mix = mix
+        self.random = random.Random(seed)
+        self.tag = f"load-{uuid.uuid4().hex[:12]}"
+        self.indexes = []
+        self.latencies = {operation: [] for operation in mix}
+        self.errors = Counter()
+
+    async def run(self, operations, concurrency):
+        """Run operations coroutines, at most concurrency of them at a time."""
+        slots = asyncio.Semaphore(concurrency)
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+
+        async def one(number):
+            async with slots:
+                operation = self.random.choices(names, weights)[0]
+                if not self.indexes:
+                    operation = "insert"
+                await self.timed(operation, number)
+
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(one(number) for number in range(operations)))
+        finally:
+            elapsed = time.perf_counter() - started
+            await self.cleanup()
+        return self.report(elapsed)
+
+    async def timed(self, operation, number):
+        connection = await self.pool.acquire()
+        started = time.perf_counter()
+        try:
+            await getattr(self, operation)(connection, number)
+        except psycopg2.Error as error:
+            self.errors[error.pgcode or type(error).__name__] += 1
+        else:
+            self.latencies[operation].append(time.perf_counter() - started)
+        finally:
+            await self.pool.release(connection, reset=False)
+
+    async def in_transaction(self, connection, statements):
+        """Run (query, params) pairs in one transaction at the chosen isolation."""
+        await connection.execute(f"BEGIN ISOLATION LEVEL {self.isolation_level}")
+        results = []
+        for query, params in statements:
+            results.append(await connection.execute(query, params))
+        await connection.execute("COMMIT")
+        return results
+
+    async def insert(self, connection, number):
+        [(rows, _)] = await self.in_transaction(
+            connection,
+            [
+                (
+                    "INSERT INTO people (name, dateofbirth) "
+                    "VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD')) RETURNING index",
+                    (f"{self.tag} {number}", "1990-08-29"),
+                )
+            ],
+        )
+        self.indexes.append(rows[0][0])
+
+    async def update(self, connection, number):
+        # Several rows per transaction, in random order, is what allows deadlocks.
+        targets = self.random.sample(
+            self.indexes, min(self.rows_per_update, len(self.indexes))
+        )
+        name = f"{self.tag} u{number}"
+        await self.in_transaction(
+            connection,
+            [
+                ("UPDATE people SET name = %s WHERE index = %s", (name, index))
+                for index in targets
+            ],
+        )
+
+    async def delete(self, connection, number):
+        if not self.indexes:
+            return
+        index = self.indexes.pop(self.random.randrange(len(self.indexes)))
+        await self.in_transaction(
+            connection, [("DELETE FROM people WHERE index = %s", (index,))]
+        )
+
+    async def cleanup(self):
+        connection = await self.pool.acquire()
+        try:
+            await connection.execute(
+                "DELETE FROM people WHERE name LIKE %s", (f"{self.tag} %",)
+            )
+        finally:
+            await self.pool.release(connection)
+
+    def report(self, elapsed):
+        completed = sum(len(latencies) for latencies in self.latencies.values())
+        report = new_report(
+            "people_load",
+            isolation_level=self.isolation_level,
+            rows_per_update=self.rows_per_update,
+            mix=self.mix,
+        )
+        report["elapsed_seconds"] = elapsed
+        report["completed"] = completed
+        report["throughput_per_second"] = completed / elapsed if elapsed else None
+        report["operations"] = {
+            operation: summarize(latencies)
+            for operation, latencies in self.latencies.items()
+            if latencies
+        }
+        report["errors"] = dict(self.errors)
+        report["serialization_failures"] = self.errors[SERIALIZATION_FAILURE]
+        report["deadlocks"] = self.errors[DEADLOCK_DETECTED]
+        return report
+
+
+async def run_people_load(
+    db_config,
+    operations,
+    concurrency,
+    connections,
+    isolation_level="read committed",
+    rows_per_update=2,
+    seed=None,
+):
+    """Run the people load scenario on its own pool and return the report."""
+    pool = AsyncConnectionPool(db_config, max_size=connections)
+    load = PeopleLoad(pool, isolation_level, rows_per_update, seed=seed)
+    try:
+        return await load.run(operations, concurrency)
+    finally:
+        pool.close_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Concurrent insert/update/delete load against people."
+    )
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument(
+        "--isolation", choices=ISOLATION_LEVELS, default="read committed"
+    )
+    parser.add_argument("--rows-per-update", type=int, default=2)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--report", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run_people_load(
+            resolve_db_config(),
+            args.operations,
+            args.concurrency,
+            args.connections,
+            args.isolation,
+            args.rows_per_update,
+            args.seed,
+        )
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            report_file.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+import psycopg2
+
+NEGATIVE_SAVEPOINT = "negative_case"
+
+
+class NegativeCase(
+    namedtuple("NegativeCase", "name query expected params", defaults=(None,))
+):
+    """A statement that must fail.
+
+    expected is a psycopg2 error class (psycopg2.errors.*), a tuple of them,
+    or a five-character SQLSTATE.
+    """
+
+    __slots__ = ()
+
+    def matches(self, error):
+        if error is None:
+            return False
+        if isinstance(self.expected, str):
+            return error.pgcode == self.expected
+        return isinstance(error, self.expected)
+
+    def describe(self, error):
+        expected = self.expected
+        if isinstance(expected, tuple):
+            expected = " or ".join(cls.__name__ for cls in expected)
+        elif not isinstance(expected, str):
+            expected = expected.__name__
+        if error is None:
+            return f"{self.name}: expected {expected}, but the statement succeeded"
+        return (
+            f"{self.name}: expected {expected}, got {type(error).__name__} "
+            f"({error.pgcode}): {error.pgerror or error}"
+        )
+
+
+def run_negative_cases(cursor, cases):
+    """Run every case on cursor's connection; return [(case, error or None)].
+
+    One savepoint is set up front and each case is sent together with the
+    ROLLBACK TO that undoes the previous one, so a case costs one round trip
+    and a failed statement never aborts the surrounding transaction. The
+    connection must not be in autocommit mode.
+    """
+    results = []
+    cursor.execute(f"SAVEPOINT {NEGATIVE_SAVEPOINT}")
+    try:
+        for case in cases:
+            try:
+                cursor.execute(
+                    f"ROLLBACK TO SAVEPOINT {NEGATIVE_SAVEPOINT}; {case.query}",
+                    case.params,
+                )
+            except psycopg2.Error as error:
+                results.append((case, error))
+            else:
+                results.append((case, None))
+    finally:
+        cursor.execute(
+            f"ROLLBACK TO SAVEPOINT {NEGATIVE_SAVEPOINT}; "
+            f"RELEASE SAVEPOINT {NEGATIVE_SAVEPOINT}"
+        )
+    return results
@@ -0,0 +1,264 @@
+# параллельный запуск тестов: каждый процесс получает свою копию базы данных,
+# созданную через CREATE DATABASE ... TEMPLATE (к исходной базе в этот момент
+# не должно быть других подключений)
+# ```python -m tests.parallel_runner -j 4 [<модуль или путь> ...]```
+
+import argparse
+import fnmatch
+import multiprocessing
+import os
+import queue as queue_module
+import sys
+import time
+import unittest
+
+from tests.admin import (
+    admin_connect,
+    clone_database,
+    drop_database,
+    terminate_connections,
+)
+from tests.connection_pool import get_pool
+from tests.fixture_state import FIXTURE_RESET, ensure_baseline_once
+from tests.helpers import WORKER_DATABASE_ENV, load_db_config
+from tests.io_stats import IO_REPORT, io_stats
+from tests.query_stats import QUERY_REPORT, query_stats
+
+DEFAULT_PATTERN = "test_db_*.py"
+RESULT_POLL_SECONDS = 1.0
+
+
+def create_worker_databases(db_config, workers):
+    """Clone the test database once per worker and return the clone names."""
+    template = db_config["database"]
+    names = [f"{template}_worker_{number}" for number in range(workers)]
+    # CREATE DATABASE ... TEMPLATE needs the source database to be idle, and
+    # the fixture check leaves its connection in the pool.
+    get_pool(db_config).close_all()
+    connection = admin_connect(db_config)
+    created = []
+    try:
+        with connection.cursor() as cursor:
+            try:
+                for name in names:
+                    drop_database(cursor, name)
+                    clone_database(cursor, name, template)
+                    created.append(name)
+            except BaseException:
+                # Drop the clones made so far: the caller never got their names.
+                for name in created:
+                    drop_database(cursor, name)
+                raise
+    finally:
+        connection.close()
+    return names
+
+
+def drop_worker_databases(db_config, names):
+    """Disconnect whatever is left in the worker databases and drop them."""
+    connection = admin_connect(db_config)
+    try:
+        with connection.cursor() as cursor:
+            for name in names:
+                terminate_connections(cursor, name)
+                drop_database(cursor, name)
+    finally:
+        connection.close()
+
+
+def collect_test_classes(suite, load_failures=None):
+    """Flatten a suite into dotted test class names, the unit of sharding.
+
+    Modules that failed to import cannot be loaded again by name in a worker
+    without losing the ImportError, so their placeholder tests go to
+    load_failures instead.
+    """
+    names = []
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            for name in collect_test_classes(test, load_failures):
+                if name not in names:
+                    names.append(name)
+        elif isinstance(test, unittest.loader._FailedTest):
+            if load_failures is not None:
+                load_failures.append(test)
+        else:
+            cls = type(test)
+            name = f"{cls.__module__}.{cls.__qualname__}"
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def load_suite(targets, pattern=DEFAULT_PATTERN):
+    """Load the given modules or files, or discover the tests directory."""
+    loader = unittest.TestLoader()
+    if not targets:
+        tests_dir = os.path.dirname(os.path.abspath(__file__))
+        targets = [
+            f"tests.{file_name[: -len('.py')]}"
+            for file_name in sorted(os.listdir(tests_dir))
+            if fnmatch.fnmatch(file_name, pattern)
+        ]
+
+    names = []
+    for target in targets:
+        if target.endswith(".py"):
+            target = os.path.relpath(target)[: -len(".py")].replace(os.sep, ".")
+        names.append(target)
+    return loader.loadTestsFromNames(names)
+
+
+def _format_outcomes(outcomes):
+    return [(test.id(), traceback) for test, traceback in outcomes]
+
+
+def _worker(database, queue, results):
+    """Run test classes from the queue against one cloned database."""
+    os.environ[WORKER_DATABASE_ENV] = database
+    loader = unittest.TestLoader()
+    summary = {"run": 0, "failures": [], "errors": [], "skipped": 0}
+    while True:
+        name = queue.get()
+        if name is None:
+            break
+        result = unittest.TestResult()
+        try:
+            loader.loadTestsFromName(name).run(result)
+        except Exception as error:
+            summary["errors"].append((name, repr(error)))
+            continue
+        summary["run"] += result.testsRun
+        summary["failures"] += _format_outcomes(result.failures)
+        summary["failures"] += [
+            (test.id(), "Unexpected success") for test in result.unexpectedSuccesses
+        ]
+        summary["errors"] += _format_outcomes(result.errors)
+        summary["skipped"] += len(result.skipped)
+    # Worker processes exit without running atexit hooks.
+    if query_stats.enabled and query_stats.statements:
+        query_stats.write_report(f"{QUERY_REPORT}.{database}")
+    if io_stats.enabled and io_stats.tests:
+        io_stats.write_report(f"{IO_REPORT}.{database}")
+    results.put(summary)
+
+
+def _gather_summaries(processes, queue, results, timeout=RESULT_POLL_SECONDS):
+    """One summary per worker; a worker that died reports an error instead.
+
+    A worker killed by a signal or os._exit never puts its summary, so
+    waiting on results alone would block forever.
+    """
+    summaries = []
+    while len(summaries) < len(processes):
+        try:
+            summaries.append(results.get(timeout=timeout))
+        except queue_module.Empty:
+            if any(process.exitcode is None for process in processes):
+                continue
+            # Everyone has exited and nothing is left to read.
+            break
+    errors = [
+        (process.name, f"Worker exited with code {process.exitcode}")
+        for process in processes
+        if process.exitcode
+    ]
+    try:
+        while True:
+            name = queue.get_nowait()
+            if name is not None:
+                errors.append((name, "Not run: every worker has exited"))
+    except queue_module.Empty:
+        pass
+    if errors:
+        summaries.append({"run": 0, "failures": [], "errors": errors, "skipped": 0})
+    return summaries
+
+
+def run_parallel(targets, workers, pattern=DEFAULT_PATTERN, stream=sys.stderr):
+    """Shard test classes over worker processes; return True if all passed."""
+    db_config = load_db_config()
+    load_failures = []
+    class_names = collect_test_classes(load_suite(targets, pattern), load_failures)
+    workers = max(1, min(workers, len(class_names)))
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    results = context.Queue()
+    for name in class_names:
+        queue.put(name)
+    for _ in range(workers):
+        queue.put(None)
+
+    started = time.perf_counter()
+    if FIXTURE_RESET:
+        ensure_baseline_once(db_config)
+    databases = create_worker_databases(db_config, workers)
+    try:
+        processes = [
+            context.Process(
+                target=_worker, args=(database, queue, results), name=database
+            )
+            for database in databases
+        ]
+        for process in processes:
+            process.start()
+        summaries = _gather_summaries(processes, queue, results)
+        for process in processes:
+            process.join()
+    finally:
+        drop_worker_databases(db_config, databases)
+    elapsed = time.perf_counter() - started
+
+    # Reported under test.id() with the original ImportError traceback.
+    result = unittest.TestResult()
+    unittest.TestSuite(load_failures).run(result)
+    summaries.append(
+        {
+            "run": result.testsRun,
+            "failures": [],
+            "errors": _format_outcomes(result.errors),
+            "skipped": 0,
+        }
+    )
+
+    run = sum(summary["run"] for summary in summaries)
+    skipped = sum(summary["skipped"] for summary in summaries)
+    failures = [item for summary in summaries for item in summary["failures"]]
+    errors = [item for summary in summaries for item in summary["errors"]]
+
+    for flavour, outcomes in (("ERROR", errors), ("FAIL", failures)):
+        for test_id, traceback in outcomes:
+            stream.write("=" * 70 + "\n")
+            stream.write(f"{flavour}: {test_id}\n")
+            stream.write("-" * 70 + "\n")
+            stream.write(f"{traceback}\n")
+    stream.write("-" * 70 + "\n")
+    stream.write(f"Ran {run} tests in {elapsed:.3f}s on {workers} workers\n\n")
+    if failures or errors:
+        stream.write(f"FAILED (failures={len(failures)}, errors={len(errors)})\n")
+        return False
+    stream.write(f"OK (skipped={skipped})\n" if skipped else "OK\n")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run database tests in parallel on cloned databases."
+    )
+    parser.add_argument("targets", nargs="*", help="test modules or files")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes and database clones",
+    )
+    parser.add_argument("-p", "--pattern", default=DEFAULT_PATTERN)
+    args = parser.parse_args(argv)
+
+    return 0 if run_parallel(args.targets, args.workers, args.pattern) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
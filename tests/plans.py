@@ -0,0 +1,104 @@
+import json
+import os
+
+PLAN_BASELINES = os.getenv(
+    "TEST_PLAN_BASELINES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "plan_baselines.json"),
+)
+UPDATE_PLAN_BASELINES = bool(os.getenv("TEST_UPDATE_PLAN_BASELINES"))
+
+
+def explain(cursor, query, params=None):
+    """Run query under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON); return the plan."""
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+    result = cursor.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+
+def walk_plan(node):
+    """Yield a plan node and all of its children, depth first."""
+    yield node
+    for child in node.get("Plans", ()):
+        yield from walk_plan(child)
+
+
+def plan_shape(plan):
+    """Describe a plan by node types, relations and indexes, ignoring costs."""
+    shape = []
+    for node in walk_plan(plan):
+        step = node["Node Type"]
+        if "Relation Name" in node:
+            step += f" on {node['Relation Name']}"
+        if "Index Name" in node:
+            step += f" using {node['Index Name']}"
+        shape.append(step)
+    return shape
+
+
+def check_plan(plan, expect_any=(), forbid=(), max_buffers=None, max_rows=None):
+    """Return the ways plan breaks the expected access path and bounds."""
+    problems = []
+    node_types = {node["Node Type"] for node in walk_plan(plan)}
+    if expect_any and not node_types & set(expect_any):
+        problems.append(f"none of {sorted(expect_any)} in plan {sorted(node_types)}")
+    for node_type in sorted(node_types & set(forbid)):
+        problems.append(f"unexpected {node_type} in plan")
+
+    # Buffer counts of the top node already include its children.
+    buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+    if max_buffers is not None and buffers > max_buffers:
+        problems.append(f"{buffers} shared buffers touched > {max_buffers}")
+
+    rows = max(
+        node.get("Actual Rows", 0) * node.get("Actual Loops", 1)
+        for node in walk_plan(plan)
+    )
+    if max_rows is not None and rows > max_rows:
+        problems.append(f"a plan node produced {rows} rows > {max_rows}")
+    return problems
+
+
+class PlanBaselines:
+    """Plan shapes stored on disk, compared against fresh plans by name."""
+
+    def __init__(self, path=PLAN_BASELINES, update=UPDATE_PLAN_BASELINES):
+        self.path = path
+        self.update = update
+        self.changed = False
+        try:
+            with open(path, encoding="utf-8") as baseline_file:
+                self.shapes = json.load(baseline_file)
+        except FileNotFoundError:
+            self.shapes = {}
+
+    def compare(self, name, shape):
+        """Return a regression message, or None if shape matches the baseline.
+
+        When updating, every shape is recorded instead. Otherwise a name
+        without a baseline is a failure too: a checkout without the committed
+        file must not silently record a new baseline.
+        """
+        baseline = self.shapes.get(name)
+        if self.update:
+            if baseline != shape:
+                self.shapes[name] = shape
+                self.changed = True
+            return None
+        if baseline is None:
+            return (
+                f"no baseline plan for {name} in {self.path}: record it with "
+                f"TEST_UPDATE_PLAN_BASELINES=1 and commit the file"
+            )
+        if baseline != shape:
+            return f"plan for {name} changed from {baseline} to {shape}"
+        return None
+
+    def save(self):
+        if not self.changed:
+            return
+        with open(self.path, "w", encoding="utf-8") as baseline_file:
+            json.dump(self.shapes, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        self.changed = False
@@ -0,0 +1,252 @@
+import atexit
+import functools
+import os
+import re
+import sys
+import weakref
+from collections import OrderedDict, namedtuple
+
+import psycopg2
+from psycopg2 import extensions
+
+# Off by default, so the functional suites send their statements as written;
+# cursors that opt in with prepare = True (the prepared benchmark) get a cache
+# of DEFAULT_CACHE_SIZE statements when this is unset.
+CACHE_SIZE = int(os.getenv("TEST_PREPARED_STATEMENTS", "0"))
+DEFAULT_CACHE_SIZE = 64
+PREPARE_THRESHOLD = int(os.getenv("TEST_PREPARE_THRESHOLD", "2"))
+PREPARE_SAVEPOINT = "harness_prepare"
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|--[^\n]*")
+_CACHEABLE = re.compile(r"\s*(?:select|insert|update|delete|with)\b", re.IGNORECASE)
+# Statements after which prepared plans may no longer match the schema, or
+# that drop the server's prepared statements. DISCARD TEMP (the pool's session
+# reset) leaves both alone.
+_INVALIDATES = re.compile(
+    r"\b(?:alter|create|drop|deallocate)\b|\bdiscard\s+(?:all|plans)\b",
+    re.IGNORECASE,
+)
+# SAVEPOINT x, or ROLLBACK TO [SAVEPOINT] x optionally followed by its RELEASE.
+_SAVEPOINT = re.compile(
+    r"\s*(savepoint|rollback\s+to(?:\s+savepoint)?)\s+(\w+)\s*"
+    r"(?:;\s*release(?:\s+savepoint)?\s+\w+\s*)?;?\s*$",
+    re.IGNORECASE,
+)
+
+Statement = namedtuple("Statement", "kind text params")
+
+_caches = weakref.WeakKeyDictionary()
+# Counters outlive the connections whose caches they belong to.
+_cache_stats = []
+
+
+@functools.lru_cache(maxsize=1024)
+def classify(query):
+    """Sort query text into "prepare" (with $n text), "invalidate" or "other"."""
+    code = _LITERALS.sub("''", query)
+    if _INVALIDATES.search(code):
+        return Statement("invalidate", None, 0)
+    if not _CACHEABLE.match(code) or ";" in code.strip().rstrip(";"):
+        return Statement("other", None, 0)
+    if "%%" in query or "%(" in query:
+        return Statement("other", None, 0)
+    counter = iter(range(1, query.count("%s") + 1))
+    text = re.sub("%s", lambda _: f"${next(counter)}", query.strip().rstrip(";"))
+    return Statement("prepare", text, query.count("%s"))
+
+
+class DdlTracker:
+    """Whether a connection's transaction holds DDL that is not undone yet.
+
+    DDL is undone when the transaction ends (the caller reports an idle
+    connection) or when it rolls back to a savepoint taken before any DDL,
+    as savepoint isolation does after every test.
+    """
+
+    __slots__ = ("pending", "_clean_savepoints")
+
+    def __init__(self):
+        self.pending = False
+        self._clean_savepoints = set()
+
+    def observe(self, query):
+        """Track query; return True if it is DDL."""
+        if classify(query).kind == "invalidate":
+            self.pending = True
+            return True
+        match = _SAVEPOINT.match(query)
+        if match is not None:
+            name = match.group(2).lower()
+            if match.group(1).lower() == "savepoint":
+                if self.pending:
+                    self._clean_savepoints.discard(name)
+                else:
+                    self._clean_savepoints.add(name)
+            elif self.pending and name in self._clean_savepoints:
+                self.pending = False
+        return False
+
+    def transaction_ended(self):
+        self.pending = False
+        self._clean_savepoints.clear()
+
+
+class _Entry:
+    __slots__ = ("statement", "hits", "name", "execute_text")
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.hits = 0
+        self.name = None
+        self.execute_text = None
+
+
+class StatementCache:
+    """Per-connection LRU of hot statements, turned into PREPARE/EXECUTE.
+
+    A statement is prepared the threshold-th time its exact text runs; after
+    that only EXECUTE name(args) is sent, so the server skips parse and
+    analysis. DDL invalidates every prepared statement (result shapes may
+    change) and bypasses the cache until it is rolled back or its
+    transaction ends.
+    """
+
+    def __init__(self, size=None, threshold=PREPARE_THRESHOLD):
+        self.size = size or CACHE_SIZE or DEFAULT_CACHE_SIZE
+        self.threshold = threshold
+        self.entries = OrderedDict()
+        self.ddl = DdlTracker()
+        self._deallocate_all = False
+        self._evicted = []
+        self._counter = 0
+        self.stats = {"executes": 0, "prepares": 0, "failures": 0, "invalidations": 0}
+        _cache_stats.append(self.stats)
+
+    def invalidate(self):
+        """Forget every prepared statement; the server copies go on next PREPARE."""
+        self.stats["invalidations"] += 1
+        self.entries.clear()
+        self._evicted.clear()
+        self._deallocate_all = True
+
+    def execute(self, cursor, execute, query, vars):
+        """Run query through execute, as EXECUTE of a prepared statement if hot."""
+        if not isinstance(query, str):
+            return execute(query, vars)
+        if self.ddl.observe(query):
+            self.invalidate()
+            return execute(query, vars)
+
+        statement = classify(query)
+        status = cursor.connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            self.ddl.transaction_ended()
+        if (
+            statement.kind != "prepare"
+            or self.ddl.pending
+            or status == extensions.TRANSACTION_STATUS_INERROR
+            or len(vars or ()) != statement.params
+            or isinstance(vars, dict)
+        ):
+            return execute(query, vars)
+
+        entry = self._entry(query, statement)
+        if entry.name is None and entry.hits >= self.threshold:
+            self._prepare(cursor, execute, entry)
+        if not entry.name:
+            return execute(query, vars)
+        self.stats["executes"] += 1
+        return execute(entry.execute_text, vars)
+
+    def _entry(self, query, statement):
+        entry = self.entries.get(query)
+        if entry is None:
+            entry = self.entries[query] = _Entry(statement)
+            if len(self.entries) > self.size:
+                _, evicted = self.entries.popitem(last=False)
+                if evicted.name:
+                    self._evicted.append(evicted.name)
+        else:
+            self.entries.move_to_end(query)
+        entry.hits += 1
+        return entry
+
+    def _prepare(self, cursor, execute, entry):
+        # A statement that fails (e.g. PREPARE with untyped parameters) must not
+        # abort the test's transaction, so inside one it runs under a savepoint.
+        guarded = not cursor.connection.autocommit
+        deallocate = ["DEALLOCATE ALL"] if self._deallocate_all else []
+        deallocate += [f"DEALLOCATE {evicted}" for evicted in self._evicted]
+        if deallocate:
+            # ROLLBACK TO SAVEPOINT does not undo DEALLOCATE: never resend one.
+            self._deallocate_all = False
+            self._evicted.clear()
+            if not self._run_guarded(execute, deallocate, guarded):
+                # Some evicted statements may still exist; drop them all.
+                self.stats["failures"] += 1
+                self.invalidate()
+                return
+
+        self._counter += 1
+        name = f"harness_{self._counter}"
+        prepare = [f"PREPARE {name} AS {entry.statement.text}"]
+        if not self._run_guarded(execute, prepare, guarded):
+            self.stats["failures"] += 1
+            entry.name = False
+            return
+        self.stats["prepares"] += 1
+        entry.name = name
+        entry.execute_text = f"EXECUTE {name}"
+        if entry.statement.params:
+            placeholders = ", ".join(["%s"] * entry.statement.params)
+            entry.execute_text += f"({placeholders})"
+
+    @staticmethod
+    def _run_guarded(execute, commands, guarded):
+        """Run commands in one round trip; return False if the server rejects them."""
+        if guarded:
+            commands = [
+                f"SAVEPOINT {PREPARE_SAVEPOINT}",
+                *commands,
+                f"RELEASE SAVEPOINT {PREPARE_SAVEPOINT}",
+            ]
+        try:
+            execute("; ".join(commands), None)
+        except psycopg2.Error:
+            if guarded:
+                execute(
+                    f"ROLLBACK TO SAVEPOINT {PREPARE_SAVEPOINT}; "
+                    f"RELEASE SAVEPOINT {PREPARE_SAVEPOINT}",
+                    None,
+                )
+            return False
+        return True
+
+
+def statement_cache(connection):
+    """The connection's statement cache, created on first use."""
+    cache = _caches.get(connection)
+    if cache is None:
+        cache = _caches[connection] = StatementCache()
+    return cache
+
+
+def prepared_stats():
+    """Sum the counters of every statement cache in this process."""
+    totals = {}
+    for stats in _cache_stats:
+        for name, value in stats.items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+@atexit.register
+def _report_prepared_stats():
+    if os.getenv("TEST_PREPARED_STATS") and _cache_stats:
+        print(
+            "Prepared statements: {prepares} prepared, {executes} executes, "
+            "{failures} failures, {invalidations} invalidations".format(
+                **prepared_stats()
+            ),
+            file=sys.stderr,
+        )
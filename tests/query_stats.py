@@ -0,0 +1,108 @@
+import atexit
+import bisect
+import json
+import os
+import re
+
+QUERY_REPORT = os.getenv("TEST_QUERY_REPORT")
+QUERY_REPORT_TOP = int(os.getenv("TEST_QUERY_REPORT_TOP", "20"))
+
+HISTOGRAM_BOUNDS = (0.0001, 0.001, 0.01, 0.1, 1.0)
+HISTOGRAM_LABELS = ("<0.1ms", "<1ms", "<10ms", "<100ms", "<1s", ">=1s")
+
+_NORMALIZE_RULES = (
+    (re.compile(r"--[^\n]*"), " "),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|%s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"\(\?(?:, ?\?)*\)(?:, ?\(\?(?:, ?\?)*\))+"), "(...)"),
+)
+
+
+def normalize_sql(statement):
+    """Collapse literals, placeholders and whitespace so variants group together."""
+    for pattern, replacement in _NORMALIZE_RULES:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip().rstrip(";").strip().lower()
+
+
+class QueryStats:
+    """Per-statement and per-test timings collected by the harness cursor."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.current_test = None
+        self.statements = {}
+        self.tests = {}
+
+    def record(self, statement, kind, seconds):
+        """Add one execute/fetch/connect timing to the session totals."""
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = {
+                "calls": 0,
+                "execute_seconds": 0.0,
+                "fetch_seconds": 0.0,
+                "max_seconds": 0.0,
+                "tests": set(),
+            }
+        if kind == "fetch":
+            entry["fetch_seconds"] += seconds
+        else:
+            entry["calls"] += 1
+            entry["execute_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+        test = self.current_test or "<no test>"
+        entry["tests"].add(test)
+        test_entry = self.tests.get(test)
+        if test_entry is None:
+            test_entry = self.tests[test] = {
+                "statements": 0,
+                "seconds": 0.0,
+                "histogram": dict.fromkeys(HISTOGRAM_LABELS, 0),
+            }
+        test_entry["seconds"] += seconds
+        if kind != "fetch":
+            test_entry["statements"] += 1
+            bucket = bisect.bisect_right(HISTOGRAM_BOUNDS, seconds)
+            test_entry["histogram"][HISTOGRAM_LABELS[bucket]] += 1
+
+    def report(self, top=QUERY_REPORT_TOP):
+        """Build the slowest-statements report and the per-test histograms."""
+        statements = []
+        for statement, entry in self.statements.items():
+            total = entry["execute_seconds"] + entry["fetch_seconds"]
+            calls = entry["calls"]
+            statements.append(
+                {
+                    "statement": statement,
+                    "calls": calls,
+                    "total_seconds": total,
+                    "execute_seconds": entry["execute_seconds"],
+                    "fetch_seconds": entry["fetch_seconds"],
+                    "mean_ms": total / calls * 1000 if calls else None,
+                    "max_ms": entry["max_seconds"] * 1000,
+                    "tests": sorted(entry["tests"]),
+                }
+            )
+        statements.sort(key=lambda item: item["total_seconds"], reverse=True)
+        return {
+            "total_seconds": sum(item["total_seconds"] for item in statements),
+            "slowest_statements": statements[:top],
+            "tests": self.tests,
+        }
+
+    def write_report(self, path):
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.report(), report_file, ensure_ascii=False, indent=2)
+
+
+query_stats = QueryStats(enabled=bool(QUERY_REPORT))
+
+
+@atexit.register
+def _write_query_report():
+    if query_stats.enabled and query_stats.statements:
+        query_stats.write_report(QUERY_REPORT)
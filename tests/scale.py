@@ -0,0 +1,111 @@
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+
+SCALE_ROWS = int(os.getenv("TEST_SCALE_ROWS", "0"))
+SCALE_OPERATIONS = int(os.getenv("TEST_SCALE_OPERATIONS", "1000"))
+SCALE_REPEATS = int(os.getenv("TEST_SCALE_REPEATS", "5"))
+SCALE_SEED = int(os.getenv("TEST_SCALE_SEED", "20240101"))
+SCALE_REPORT = os.getenv("TEST_SCALE_REPORT", "scale_report.json")
+
+DEFAULT_BUDGETS = {
+    "insert": {"max_p95_ms": 10},
+    "lookup_by_index": {"max_p95_ms": 5},
+    "update_by_index": {"max_p95_ms": 10},
+    "delete_by_index": {"max_p95_ms": 10},
+    "count": {"max_p95_ms": 5000},
+    "order_by_name_dateofbirth": {"min_ops_per_second": 100000},
+}
+
+
+def load_budgets(defaults=DEFAULT_BUDGETS):
+    """Merge TEST_SCALE_BUDGETS (inline JSON or a JSON file) over defaults."""
+    budgets = {name: dict(budget) for name, budget in defaults.items()}
+    raw = os.getenv("TEST_SCALE_BUDGETS")
+    if not raw:
+        return budgets
+    if os.path.isfile(raw):
+        with open(raw, encoding="utf-8") as budget_file:
+            raw = budget_file.read()
+    for name, budget in json.loads(raw).items():
+        budgets.setdefault(name, {}).update(budget)
+    return budgets
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies, operations=None):
+    """Summarize per-call latencies in seconds into a comparable record.
+
+    operations defaults to one per call; pass the row count for scans that are
+    timed as a single call but should report rows per second.
+    """
+    total = sum(latencies)
+    operations = len(latencies) if operations is None else operations
+    return {
+        "operations": operations,
+        "total_seconds": total,
+        "ops_per_second": operations / total if total else None,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def check_budget(summary, budget):
+    """Return human-readable budget violations for one operation summary."""
+    violations = []
+    max_p95_ms = budget.get("max_p95_ms")
+    if max_p95_ms is not None and summary["p95_ms"] > max_p95_ms:
+        violations.append(f"p95 {summary['p95_ms']:.3f} ms > {max_p95_ms} ms")
+    min_ops = budget.get("min_ops_per_second")
+    ops = summary["ops_per_second"]
+    if min_ops is not None and ops is not None and ops < min_ops:
+        violations.append(f"throughput {ops:.1f}/s < {min_ops}/s")
+    return violations
+
+
+def time_call(function, *args):
+    """Run function(*args) and return its duration in seconds."""
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_report(suite, **parameters):
+    """Start a report with the metadata needed to compare runs across commits."""
+    return {
+        "suite": suite,
+        "commit": git_commit(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": parameters,
+        "operations": {},
+        "violations": {},
+    }
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2, sort_keys=True)
@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+SNAPSHOT_QUERY = """
+    SELECT c.oid, c.relname, a.attnum, a.attname,
+           format_type(a.atttypid, a.atttypmod)
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_catalog.pg_attribute a
+        ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    WHERE n.nspname = %s
+      AND c.relkind IN ('r', 'p')
+      AND (c.relname::text = ANY(%s::text[]) OR c.oid = ANY(%s::oid[]))
+    ORDER BY c.oid, a.attnum
+"""
+
+TableSnapshot = namedtuple("TableSnapshot", "name columns")
+Column = namedtuple("Column", "name type")
+
+
+class SchemaDiff(
+    namedtuple(
+        "SchemaDiff",
+        "renamed_tables dropped_tables renamed_columns added_columns "
+        "dropped_columns retyped_columns",
+        defaults=((),) * 6,
+    )
+):
+    """Structured difference between two schema snapshots.
+
+    renamed_tables: (old name, new name)
+    dropped_tables: name
+    renamed_columns: (table, old name, new name)
+    added_columns: (table, name, type)
+    dropped_columns: (table, name)
+    retyped_columns: (table, name, old type, new type)
+    """
+
+    __slots__ = ()
+
+
+def take_snapshot(cursor, tables, oids=(), schema="public"):
+    """Read the columns of the given tables from pg_catalog in one query.
+
+    Tables are keyed by OID, which survives renames, so a later snapshot taken
+    with the same oids can tell a renamed table from a dropped one.
+    """
+    cursor.execute(SNAPSHOT_QUERY, (schema, [t.lower() for t in tables], list(oids)))
+    snapshot = {}
+    for oid, table_name, attnum, column_name, column_type in cursor.fetchall():
+        table = snapshot.setdefault(oid, TableSnapshot(table_name, {}))
+        if attnum is not None:
+            table.columns[attnum] = Column(column_name, column_type)
+    return snapshot
+
+
+def table_names(snapshot):
+    return {table.name for table in snapshot.values()}
+
+
+def diff_snapshots(before, after):
+    """Compare two snapshots table by table and column by column."""
+    renamed_tables = []
+    dropped_tables = []
+    renamed_columns = []
+    added_columns = []
+    dropped_columns = []
+    retyped_columns = []
+
+    for oid, old_table in before.items():
+        new_table = after.get(oid)
+        if new_table is None:
+            dropped_tables.append(old_table.name)
+            continue
+        if new_table.name != old_table.name:
+            renamed_tables.append((old_table.name, new_table.name))
+
+        table = new_table.name
+        for attnum, old_column in old_table.columns.items():
+            new_column = new_table.columns.get(attnum)
+            if new_column is None:
+                dropped_columns.append((table, old_column.name))
+                continue
+            if new_column.name != old_column.name:
+                renamed_columns.append((table, old_column.name, new_column.name))
+            if new_column.type != old_column.type:
+                retyped_columns.append(
+                    (table, new_column.name, old_column.type, new_column.type)
+                )
+        for attnum, new_column in new_table.columns.items():
+            if attnum not in old_table.columns:
+                added_columns.append((table, new_column.name, new_column.type))
+
+    return SchemaDiff(
+        tuple(renamed_tables),
+        tuple(dropped_tables),
+        tuple(renamed_columns),
+        tuple(added_columns),
+        tuple(dropped_columns),
+        tuple(retyped_columns),
+    )
@@ -0,0 +1,242 @@
+# длительный прогон набора тестов в цикле для поиска утечек: после каждой
+# итерации записываются рост кучи Python, открытые дескрипторы, соединения и
+# курсоры, число серверных процессов и их память; растущий тренд = провал
+# ```python -m tests.soak --hours 4 [<модуль или путь> ...]
+# python -m tests.soak -n 50 tests/test_db_persons_check_table_change.py```
+# отчёт: TEST_SOAK_REPORT (по умолчанию soak_report.json)
+
+import argparse
+import gc
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import unittest
+
+import psycopg2
+from psycopg2 import extensions
+
+from tests.helpers import resolve_db_config
+from tests.parallel_runner import DEFAULT_PATTERN, load_suite
+from tests.scale import new_report, write_report
+
+SOAK_ITERATIONS = int(os.getenv("TEST_SOAK_ITERATIONS", "20"))
+SOAK_HOURS = float(os.getenv("TEST_SOAK_HOURS", "0"))
+SOAK_WARMUP = int(os.getenv("TEST_SOAK_WARMUP", "3"))
+SOAK_REPORT = os.getenv("TEST_SOAK_REPORT", "soak_report.json")
+MIN_TREND_SAMPLES = 3
+TOP_ALLOCATIONS = 10
+
+# Metric -> largest tolerated growth per iteration (least-squares slope over
+# the iterations after warm-up). Caches and the connection pool fill up
+# during warm-up and stay flat afterwards.
+TREND_LIMITS = {
+    "python_heap_bytes": 64 * 1024,
+    "open_fds": 0.1,
+    "open_connections": 0.05,
+    "open_cursors": 0.05,
+    "server_backends": 0.05,
+    "backend_rss_bytes": 256 * 1024,
+}
+
+BACKENDS_QUERY = """
+    SELECT pid FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+
+def open_fds():
+    """Open file descriptors of this process, or None where /proc is missing."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def open_psycopg_objects():
+    """(open connections, open cursors) still reachable in this process."""
+    connections = cursors = 0
+    for candidate in gc.get_objects():
+        if isinstance(candidate, extensions.connection):
+            connections += not candidate.closed
+        elif isinstance(candidate, extensions.cursor):
+            cursors += not candidate.closed
+    return connections, cursors
+
+
+def backend_rss(pid):
+    """Resident memory of a local server process in bytes, or None.
+
+    Only works when the server runs on this host; the command name is checked
+    so a remote server's pid never matches an unrelated local process.
+    """
+    try:
+        with open(f"/proc/{pid}/comm", encoding="utf-8") as comm:
+            if not comm.read().startswith("postgres"):
+                return None
+        with open(f"/proc/{pid}/status", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def take_sample(monitor):
+    """One row of leak metrics, measured between two suite iterations."""
+    gc.collect()
+    connections, cursors = open_psycopg_objects()
+    with monitor.cursor() as cursor:
+        cursor.execute(BACKENDS_QUERY)
+        pids = [pid for (pid,) in cursor.fetchall()]
+    sizes = [backend_rss(pid) for pid in pids]
+    return {
+        "python_heap_bytes": tracemalloc.get_traced_memory()[0],
+        "open_fds": open_fds(),
+        # The monitor's own connection and cursor are not the suite's.
+        "open_connections": connections - 1,
+        "open_cursors": cursors,
+        "server_backends": len(pids),
+        "backend_rss_bytes": sum(sizes) if sizes and None not in sizes else None,
+    }
+
+
+def trends(samples):
+    """{metric: {slope, first, last}} over samples, for metrics always measured."""
+    result = {}
+    if len(samples) < MIN_TREND_SAMPLES:
+        return result
+    for metric in TREND_LIMITS:
+        values = [sample[metric] for sample in samples]
+        if None in values:
+            continue
+        slope = statistics.linear_regression(range(len(values)), values).slope
+        result[metric] = {"slope": slope, "first": values[0], "last": values[-1]}
+    return result
+
+
+def trend_violations(found):
+    """Metrics that grew faster than their limit and ended above their start."""
+    return {
+        metric: (
+            f"grows by {trend['slope']:.1f} per iteration "
+            f"({trend['first']} -> {trend['last']}, limit {TREND_LIMITS[metric]})"
+        )
+        for metric, trend in found.items()
+        if trend["slope"] > TREND_LIMITS[metric] and trend["last"] > trend["first"]
+    }
+
+
+def top_allocations(before, after, limit=TOP_ALLOCATIONS):
+    """Source lines whose allocations grew the most between two snapshots."""
+    return [
+        {"where": str(stat.traceback), "size_diff": stat.size_diff}
+        for stat in after.compare_to(before, "lineno")[:limit]
+        if stat.size_diff > 0
+    ]
+
+
+def run_soak(
+    targets,
+    iterations=SOAK_ITERATIONS,
+    hours=SOAK_HOURS,
+    warmup=SOAK_WARMUP,
+    pattern=DEFAULT_PATTERN,
+    stream=sys.stderr,
+):
+    """Run the suite repeatedly; return a report with the metric trends.
+
+    With hours set the loop runs until the deadline, otherwise for the given
+    number of iterations. The first warmup iterations are excluded from the
+    trends.
+    """
+    report = new_report(
+        "soak", iterations=iterations, hours=hours, warmup=warmup, targets=targets
+    )
+    deadline = time.monotonic() + hours * 3600 if hours else None
+    samples = []
+    baseline_snapshot = None
+    tracemalloc.start()
+    monitor = psycopg2.connect(**resolve_db_config())
+    monitor.autocommit = True
+    try:
+        while (
+            time.monotonic() < deadline
+            if deadline is not None
+            else len(samples) < iterations
+        ):
+            started = time.perf_counter()
+            # A TestSuite drops its tests as they run: load a fresh one each time.
+            result = unittest.TextTestRunner(stream=io.StringIO()).run(
+                load_suite(targets, pattern)
+            )
+            sample = take_sample(monitor)
+            sample.update(
+                seconds=time.perf_counter() - started,
+                tests=result.testsRun,
+                failures=len(result.failures),
+                errors=len(result.errors),
+            )
+            samples.append(sample)
+            if len(samples) == warmup + 1:
+                baseline_snapshot = tracemalloc.take_snapshot()
+            stream.write(
+                f"iteration {len(samples)}: "
+                + ", ".join(f"{key}={value}" for key, value in sample.items())
+                + "\n"
+            )
+        final_snapshot = tracemalloc.take_snapshot()
+    finally:
+        monitor.close()
+        tracemalloc.stop()
+
+    found = trends(samples[warmup:])
+    report["operations"] = {
+        "iterations": samples,
+        "trends": found,
+        "top_allocations": (
+            top_allocations(baseline_snapshot, final_snapshot)
+            if baseline_snapshot is not None
+            else []
+        ),
+    }
+    report["violations"] = trend_violations(found)
+    failed = [
+        number
+        for number, sample in enumerate(samples, 1)
+        if sample["failures"] or sample["errors"]
+    ]
+    if failed:
+        report["violations"]["tests"] = f"tests failed in iterations {failed}"
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the database tests in a loop and fail on resource leaks."
+    )
+    parser.add_argument("targets", nargs="*", help="test modules or files")
+    parser.add_argument("-n", "--iterations", type=int, default=SOAK_ITERATIONS)
+    parser.add_argument(
+        "--hours", type=float, default=SOAK_HOURS, help="run until this much time"
+    )
+    parser.add_argument("--warmup", type=int, default=SOAK_WARMUP)
+    parser.add_argument("-p", "--pattern", default=DEFAULT_PATTERN)
+    args = parser.parse_args(argv)
+
+    report = run_soak(
+        args.targets, args.iterations, args.hours, args.warmup, args.pattern
+    )
+    write_report(report, SOAK_REPORT)
+    for metric, message in report["violations"].items():
+        print(f"LEAK? {metric}: {message}")
+    if len(report["operations"]["iterations"]) - args.warmup < MIN_TREND_SAMPLES:
+        print(f"Too few iterations after warm-up to judge trends ({SOAK_REPORT})")
+    return 1 if report["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# проверка разбора двоичного формата COPY (без подключения к БД):
+# ```python -m unittest tests/test_binary_copy.py```
+
+import struct
+import unittest
+from unittest import mock
+
+from tests.binary_copy import (
+    COPY_SIGNATURE,
+    BinaryCopyReader,
+    date_to_day,
+    missing_from_columns,
+    timestamp_to_microseconds,
+)
+
+TYPES = ("text", "date", "timestamp")
+ROWS = [
+    ("Анна", "1990-01-01", "1990-01-01T12:30:00"),
+    ("", "2000-01-01", None),
+    (None, None, "1969-07-20T20:17:40.5"),
+    ("x" * 300, "-infinity", "-infinity"),
+    ("y", "infinity", "infinity"),
+    ("😀 emoji", "9999-12-31", "2000-01-01T00:00:00"),
+]
+
+
+def decoded_value(column_type, value):
+    """value as the decoder stores it: UTF-8 bytes, days or microseconds."""
+    if value is None:
+        return None
+    if column_type == "text":
+        return value.encode("utf-8")
+    if column_type == "date":
+        return date_to_day(value)
+    return timestamp_to_microseconds(value)
+
+
+def encode_field(column_type, value):
+    value = decoded_value(column_type, value)
+    if value is None:
+        return struct.pack("!i", -1)
+    if column_type != "text":
+        value = struct.pack("!i" if column_type == "date" else "!q", value)
+    return struct.pack("!i", len(value)) + value
+
+
+def copy_stream(rows, types=TYPES):
+    """What COPY ... TO STDOUT (FORMAT binary) sends for rows."""
+    stream = COPY_SIGNATURE + struct.pack("!ii", 0, 0)
+    for row in rows:
+        stream += struct.pack("!h", len(types))
+        stream += b"".join(map(encode_field, types, row))
+    return stream + struct.pack("!h", -1)
+
+
+def decoded_rows(reader):
+    return [
+        tuple(column.value(index) for column in reader.columns)
+        for index in range(reader.rows)
+    ]
+
+
+def expected_rows(rows, types=TYPES):
+    return [tuple(map(decoded_value, types, row)) for row in rows]
+
+
+class BinaryCopyReaderTest(unittest.TestCase):
+    def test_decodes_whole_stream(self):
+        """Decoder: every type, NULLs and -infinity survive one write."""
+        reader = BinaryCopyReader(TYPES)
+        reader.write(copy_stream(ROWS))
+        self.assertTrue(reader.finished)
+        self.assertEqual(decoded_rows(reader), expected_rows(ROWS))
+
+    def test_tuples_split_across_chunks(self):
+        """Decoder: the result does not depend on where chunks are cut."""
+        stream = copy_stream(ROWS)
+        for size in (1, 2, 3, 5, 7, 13, 64):
+            with self.subTest(chunk_size=size):
+                reader = BinaryCopyReader(TYPES)
+                for start in range(0, len(stream), size):
+                    reader.write(stream[start : start + size])
+                self.assertTrue(reader.finished)
+                self.assertEqual(decoded_rows(reader), expected_rows(ROWS))
+
+    def test_every_single_cut(self):
+        """Decoder: two chunks, cut at every byte of the stream."""
+        stream = copy_stream(ROWS[:3])
+        reader = BinaryCopyReader(TYPES)
+        for cut in range(len(stream) + 1):
+            reader.clear()
+            reader.write(stream[:cut])
+            reader.write(stream[cut:])
+            self.assertEqual(decoded_rows(reader), expected_rows(ROWS[:3]), cut)
+
+    def test_clear_reuses_reader(self):
+        """Decoder: clear() forgets earlier rows and the header."""
+        reader = BinaryCopyReader(TYPES)
+        reader.write(copy_stream(ROWS))
+        reader.clear()
+        reader.write(copy_stream(ROWS[:1]))
+        self.assertEqual(decoded_rows(reader), expected_rows(ROWS[:1]))
+
+    def test_rejects_other_formats(self):
+        """Decoder: a text COPY stream or a wrong field count is an error."""
+        with self.assertRaises(ValueError):
+            BinaryCopyReader(TYPES).write(b"name\t2000-01-01\n" * 4)
+        with self.assertRaises(ValueError):
+            BinaryCopyReader(TYPES[:2]).write(copy_stream(ROWS))
+        with self.assertRaises(ValueError):
+            BinaryCopyReader(("json",))
+
+
+class MissingFromColumnsTest(unittest.TestCase):
+    def setUp(self):
+        self.reader = BinaryCopyReader(("text", "timestamp"))
+        self.reader.write(
+            copy_stream(
+                [("a", "2000-01-01T00:00:00"), ("x", None), ("y", "-infinity")],
+                ("text", "timestamp"),
+            )
+        )
+
+    def check(self):
+        reader = self.reader
+        self.assertEqual(
+            missing_from_columns(reader, [("a", "2000-01-01T00:00:00")]), []
+        )
+        self.assertEqual(missing_from_columns(reader, [("x", None)]), [])
+        self.assertEqual(missing_from_columns(reader, [("y", "-infinity")]), [])
+        self.assertEqual(
+            missing_from_columns(reader, [("y", None), ("x", "2000-01-01T00:00:00")]),
+            [("y", None), ("x", "2000-01-01T00:00:00")],
+        )
+        self.assertEqual(missing_from_columns(reader, []), [])
+
+    def test_matches_rows(self):
+        """Matcher: NULLs match None and never -infinity, with NumPy if present."""
+        self.check()
+
+    def test_matches_rows_without_numpy(self):
+        """Matcher: the same answers through the pure Python prefilter."""
+        with mock.patch("tests.binary_copy.optional_numpy", return_value=None):
+            self.check()
+
+    def test_text_only_columns(self):
+        """Matcher: without a fixed-width column every row is a candidate."""
+        reader = BinaryCopyReader(("text",))
+        reader.write(copy_stream([("a",), (None,)], ("text",)))
+        self.assertEqual(
+            missing_from_columns(reader, [(None,), ("a",), ("b",)]), [("b",)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# проверка кэша запросов к каталогу: повторный запрос в следующем тесте
+# не должен отправлять на сервер ни одного запроса
+# ```python -m unittest tests/test_db_catalog_cache.py```
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.catalog_cache import FINGERPRINT_QUERY, CatalogCache
+from tests.helpers import BaseClassForDateBase
+
+LOOKUP_QUERY = (
+    "SELECT column_name "
+    "FROM information_schema.columns "
+    "WHERE table_name = 'persons' AND column_name = 'firstname';"
+)
+
+
+def consecutive_lookups(sent, per_test):
+    """Two harness tests that each run LOOKUP_QUERY through catalog_lookup.
+
+    Statements the harness sends are appended to sent; each lookup records
+    the slice it caused in per_test. Defined in a function so the loader does
+    not collect it on its own.
+    """
+
+    class ConsecutiveLookups(BaseClassForDateBase):
+        def test_1_first(self):
+            self.lookup()
+
+        def test_2_second(self):
+            self.lookup()
+
+        def lookup(self):
+            start = len(sent)
+            self.assertTrue(self.catalog_lookup(LOOKUP_QUERY))
+            per_test.append(sent[start:])
+
+    return ConsecutiveLookups
+
+
+class CatalogCacheQueriesTest(unittest.TestCase):
+    def test_hit_in_next_test_sends_no_query(self):
+        """Catalog cache: only the first of two consecutive tests queries."""
+        sent = []
+        per_test = []
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CatalogCache(os.path.join(directory, "catalog_cache.json"))
+            observe = cache.observe
+
+            def recording_observe(connection, query):
+                sent.append(query)
+                observe(connection, query)
+
+            cache.observe = recording_observe
+            with mock.patch("tests.helpers.catalog_cache", cache), mock.patch(
+                "tests.cursors.catalog_cache", cache
+            ):
+                result = unittest.TestResult()
+                unittest.defaultTestLoader.loadTestsFromTestCase(
+                    consecutive_lookups(sent, per_test)
+                ).run(result)
+
+        self.assertTrue(result.wasSuccessful(), result.errors + result.failures)
+        first, second = per_test
+        self.assertEqual(first, [FINGERPRINT_QUERY, LOOKUP_QUERY])
+        self.assertEqual(second, [], "The second lookup should be a pure hit")
+        self.assertEqual(
+            cache.stats, {"hits": 1, "misses": 1, "bypassed": 0, "fingerprints": 1}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,30 +3,28 @@
 # ```$env:TEST_ENV="local"
 # python -m unittest <путь>
 # $env:TEST_ENV=$null```
+# изоляция тестов через точки сохранения в одной транзакции на класс:
+# ```$env:TEST_ISOLATION="savepoint"```
 
 import random
 import unittest
 
-from dotenv import load_dotenv
-from faker import Faker
+from psycopg2 import errors
+from tests.datagen import get_faker
 from tests.helpers import BaseClassForDateBase
-from psycopg2 import Error
-
-load_dotenv()
+from tests.negative_cases import NegativeCase
 
 
 class PositiveTestPeopleTable(BaseClassForDateBase):
     def test_add_string_with_valid_data(self):
         """Test: Add one row -> all input data is valid."""
-        fake = Faker("ru_RU")
+        fake = get_faker("ru_RU")
         string_vars = (fake.name(), fake.date())
         insert_query = """INSERT INTO people (name, dateofbirth) VALUES (%s, %s)"""
         self.cursor.execute(insert_query, string_vars)
 
-        self.cursor.execute("SELECT * FROM people WHERE name = %s", (string_vars[0],))
-        record = self.cursor.fetchone()
-        self.assertIsNotNone(record)
-        self.assertEqual(record[1], string_vars[0])
+        self.assertEqual(self.cursor.rowcount, 1)
+        self.assertRowsInTable("people", ("name", "dateofbirth"), [string_vars])
 
     def test_add_multiple_strings_with_valid_data(self):
         """Test: Add several rows with valid data. Ensure 4 rows are added."""
@@ -38,19 +36,10 @@ class PositiveTestPeopleTable(BaseClassForDateBase):
             ("Наташа", "9999-12-31"),  # Maximum valid date
         ]
 
-        self.cursor.execute("SELECT COUNT(*) FROM people")
-        number_of_rows_in_table_now = self.cursor.fetchone()[0]
+        inserted = self.bulk_load("people", ("name", "dateofbirth"), valid_rows)
 
-        insert_query = """
-            INSERT INTO people (name, dateofbirth) 
-            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD'))
-        """
-        self.cursor.executemany(insert_query, valid_rows)
-
-        self.cursor.execute("SELECT COUNT(*) FROM people")
-        number_of_rows_after_insert = self.cursor.fetchone()[0]
-
-        self.assertEqual(number_of_rows_after_insert - number_of_rows_in_table_now, 4)
+        self.assertEqual(inserted, 4)
+        self.assertRowsInTable("people", ("name", "dateofbirth"), valid_rows)
 
     def test_update_string_by_id(self):
         """Test: Update a row by id -> the row is correctly updated."""
@@ -88,9 +77,9 @@ class PositiveTestPeopleTable(BaseClassForDateBase):
 
     def test_insert_name_with_various_characters(self):
         """Test: Field 'name' accepts Latin, Cyrillic, numbers, special characters, and spaces."""
-        fake = Faker()
+        fake = get_faker()
         latin_name = fake.first_name()
-        fake_ru = Faker("ru_RU")
+        fake_ru = get_faker("ru_RU")
         cyrillic_name = fake_ru.first_name()
         numeric_string = str(random.randint(100000, 999999))
         space_string = f"{fake.first_name()} {fake.last_name()}  with   2 and 3 spaces"
@@ -102,77 +91,69 @@ class PositiveTestPeopleTable(BaseClassForDateBase):
             (space_string, "1990-10-09"),
         ]
 
-        self.cursor.execute("SELECT COUNT(*) FROM people")
-        strings_count_before_insert = self.cursor.fetchone()[0]
-
-        insert_query = """
-            INSERT INTO people (name, dateofbirth) 
-            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD'))
-        """
-        self.cursor.executemany(insert_query, input_data_for_insert)
-
-        self.cursor.execute("SELECT COUNT(*) FROM people")
-        strings_count_after_insert = self.cursor.fetchone()[0]
+        inserted = self.bulk_load(
+            "people", ("name", "dateofbirth"), input_data_for_insert
+        )
 
         self.assertEqual(
-            strings_count_after_insert - strings_count_before_insert,
-            len(input_data_for_insert),
-            "Inserted row count does not match",
+            inserted, len(input_data_for_insert), "Inserted row count does not match"
         )
-
-        self.cursor.execute(
-            "SELECT name, dateofbirth FROM people ORDER BY name, dateofbirth"
+        self.assertRowsInTable(
+            "people", ("name", "dateofbirth"), input_data_for_insert
         )
-        records = self.cursor.fetchall()
 
-        records_for_compare = [
-            (name, date_obj.strftime("%Y-%m-%d")) for name, date_obj in records
-        ]
 
-        for string in input_data_for_insert:
-            self.assertIn(
-                string,
-                records_for_compare,
-                f"Inserted row {string} not found in records",
-            )
+INSERT_QUERY = """
+    INSERT INTO people (name, dateofbirth)
+    VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD'))
+"""
 
 
 class NegativeTestPeopleTable(BaseClassForDateBase):
+    def assertInsertFails(self, params, expected, query=INSERT_QUERY):
+        """Assert that query with params fails with expected (a psycopg2 error)."""
+        self.assertStatementsFail(
+            [NegativeCase(self._testMethodName, query, expected, params)]
+        )
+
     def test_insert_invalid_null_name(self):
         """Test: Create a string with name == null -> string is not created."""
-        insert_query = """
-            INSERT INTO people (name, dateofbirth) 
-            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD')
-        """
-        with self.assertRaises(Error):
-            self.cursor.execute(insert_query, (None, "1990-06-06"))
+        self.assertInsertFails((None, "1990-06-06"), errors.NotNullViolation)
 
     def test_insert_invalid_name_256_chars(self):
         """Test: Create a string with a name of 256 characters -> string is not created."""
-        insert_query = """
-            INSERT INTO people (name, dateofbirth) 
-            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD')
-        """
-        with self.assertRaises(Error):
-            self.cursor.execute(insert_query, ("A" * 256, "1990-06-06"))
+        self.assertInsertFails(
+            ("A" * 256, "1990-06-06"), errors.StringDataRightTruncation
+        )
 
     def test_insert_invalid_date(self):
         """Test: Create a string with invalid date 0001-01-00 -> string is not created."""
-        insert_query = """
-            INSERT INTO people (name, dateofbirth) 
-            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD')
-        """
-        with self.assertRaises(Error):
-            self.cursor.execute(insert_query, ("Наташа", "0001-01-00"))
+        self.assertInsertFails(("Наташа", "0001-01-00"), errors.DatetimeFieldOverflow)
 
     def test_insert_invalid_date_10000(self):
         """Test: Create a row with invalid date 10000-01-01 -> string not created."""
-        insert_query = """
-            INSERT INTO people (name, dateofbirth) 
-            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD')
-        """
-        with self.assertRaises(Error):
-            self.cursor.execute(insert_query, ("Наташа", "10000-01-01"))
+        # A valid PostgreSQL date: only the table's CHECK constraint rejects it.
+        self.assertInsertFails(("Наташа", "10000-01-01"), errors.CheckViolation)
+
+    def test_insert_invalid_date_format(self):
+        """Test: Create a row with a date that is not a date -> not created."""
+        self.assertInsertFails(("Наташа", "not a date"), errors.InvalidDatetimeFormat)
+
+    def test_insert_into_nonexistent_column(self):
+        """Test: Insert into a nonexistent column -> row is not created."""
+        self.assertInsertFails(
+            ("Наташа", "1990-06-06"),
+            errors.UndefinedColumn,
+            "INSERT INTO people (name, nonexistent) VALUES (%s, %s)",
+        )
+
+    def test_insert_into_nonexistent_table(self):
+        """Test: Insert into a nonexistent table -> row is not created."""
+        self.assertInsertFails(
+            ("Наташа",),
+            errors.UndefinedTable,
+            "INSERT INTO nonexistent_people (name) VALUES (%s)",
+        )
 
     def test_request_for_non_existent_string(self):
         """Test: Try to get a string that does not exist -> string is not received."""
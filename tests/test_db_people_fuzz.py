@@ -0,0 +1,32 @@
+# поиск граничных значений name/dateofbirth, при которых таблица people
+# расходится со спецификацией, запускается только при заданном числе случаев:
+# ```$env:TEST_FUZZ_CASES="200000"
+# python -m unittest tests/test_db_people_fuzz.py
+# $env:TEST_FUZZ_CASES=$null```
+# размер пакета: TEST_FUZZ_BATCH_SIZE, зерно генератора: TEST_FUZZ_SEED
+
+import unittest
+
+from tests.fuzz import FUZZ_CASES, CandidateGenerator, PeopleFuzzer
+from tests.helpers import BaseClassForDateBase
+
+
+@unittest.skipUnless(FUZZ_CASES, "TEST_FUZZ_CASES is not set")
+class FuzzTestPeopleTable(BaseClassForDateBase):
+    isolation = "savepoint"
+
+    def test_name_and_dateofbirth_constraints(self):
+        """Fuzz: people accepts exactly the rows the oracle says are valid."""
+        fuzzer = PeopleFuzzer(self.cursor)
+        summary = fuzzer.run(CandidateGenerator().candidates(FUZZ_CASES))
+
+        self.assertEqual(summary["cases"], FUZZ_CASES)
+        self.assertFalse(
+            summary["minimal"],
+            f"{summary['mismatches']} of {summary['cases']} cases disagree with "
+            f"the oracle; minimal examples: {summary['minimal']}",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# сравнение индексов для поиска people по name на заполненной таблице,
+# запускается только при заданном размере:
+# ```$env:TEST_INDEX_ROWS="2000000"
+# python -m unittest tests/test_db_people_indexes.py
+# $env:TEST_INDEX_ROWS=$null```
+# отчёт пишется в TEST_INDEX_REPORT (по умолчанию index_report.json),
+# сводная таблица выводится в stderr
+
+import os
+import sys
+import unittest
+
+from tests.helpers import BaseClassForDateBase
+from tests.index_benchmark import (
+    INDEX_STRATEGIES,
+    existing_indexes,
+    measure_strategy,
+    sample_names,
+    summary_table,
+)
+from tests.scale import SCALE_SEED, new_report, write_report
+
+INDEX_ROWS = int(os.getenv("TEST_INDEX_ROWS", "0"))
+INDEX_LOOKUPS = int(os.getenv("TEST_INDEX_LOOKUPS", "1000"))
+INDEX_ORDERED_SCAN = os.getenv("TEST_INDEX_ORDERED_SCAN", "1") != "0"
+INDEX_REPORT = os.getenv("TEST_INDEX_REPORT", "index_report.json")
+
+
+@unittest.skipUnless(INDEX_ROWS, "TEST_INDEX_ROWS is not set")
+class IndexBenchmarkPeopleTable(BaseClassForDateBase):
+    isolation = "savepoint"
+
+    @classmethod
+    def setUpClass(cls):
+        """Seed people once; every strategy's index is rolled back after it."""
+        super().setUpClass()
+        cls.report = new_report(
+            "people_indexes",
+            rows=INDEX_ROWS,
+            lookups=INDEX_LOOKUPS,
+            ordered_scan=INDEX_ORDERED_SCAN,
+            seed=SCALE_SEED,
+        )
+        with cls.seed_people(INDEX_ROWS) as cursor:
+            cls.report["existing_indexes"] = existing_indexes(cursor)
+            cls.names = sample_names(cursor, INDEX_LOOKUPS)
+
+    @classmethod
+    def tearDownClass(cls):
+        write_report(cls.report, INDEX_REPORT)
+        if cls.report["operations"]:
+            print(f"\n{summary_table(cls.report)}", file=sys.stderr)
+        super().tearDownClass()
+
+    def test_name_access_strategies(self):
+        """Benchmark: build, size, lookups and ordered scan per index strategy."""
+        # Plain text for every strategy: the CREATE INDEX of each strategy
+        # would switch the statement cache off mid-run, so "none" would be the
+        # only one timed with prepared statements.
+        self.cursor.prepare = False
+        for strategy in INDEX_STRATEGIES:
+            with self.subTest(strategy=strategy):
+                self.cursor.execute("SAVEPOINT index_strategy")
+                try:
+                    result = measure_strategy(
+                        self.cursor,
+                        self.connection,
+                        strategy,
+                        self.names,
+                        INDEX_ORDERED_SCAN,
+                    )
+                finally:
+                    self.cursor.execute("ROLLBACK TO SAVEPOINT index_strategy")
+                    self.cursor.execute("RELEASE SAVEPOINT index_strategy")
+                self.report["operations"][strategy] = result
+                self.assertEqual(result["lookup"]["operations"], len(self.names))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# конкурентная нагрузка на people запускается только при заданном числе операций:
+# ```$env:TEST_LOAD_OPERATIONS="5000"
+# python -m unittest tests/test_db_people_load.py
+# $env:TEST_LOAD_OPERATIONS=$null```
+# отчёт пишется в TEST_LOAD_REPORT (по умолчанию load_report.json)
+
+import os
+import unittest
+
+from tests.aio import AsyncBaseClassForDateBase
+from tests.load_people import (
+    DEADLOCK_DETECTED,
+    SERIALIZATION_FAILURE,
+    run_people_load,
+)
+from tests.scale import write_report
+
+LOAD_OPERATIONS = int(os.getenv("TEST_LOAD_OPERATIONS", "0"))
+LOAD_CONCURRENCY = int(os.getenv("TEST_LOAD_CONCURRENCY", "500"))
+LOAD_CONNECTIONS = int(os.getenv("TEST_LOAD_CONNECTIONS", "20"))
+LOAD_ISOLATION = os.getenv("TEST_LOAD_ISOLATION", "read committed")
+LOAD_REPORT = os.getenv("TEST_LOAD_REPORT", "load_report.json")
+
+
+@unittest.skipUnless(LOAD_OPERATIONS, "TEST_LOAD_OPERATIONS is not set")
+class LoadTestPeopleTable(AsyncBaseClassForDateBase):
+    async def test_concurrent_dml_by_index(self):
+        """Load: concurrent insert/update/delete by index -> only contention errors."""
+        report = await run_people_load(
+            self.db_config,
+            LOAD_OPERATIONS,
+            LOAD_CONCURRENCY,
+            LOAD_CONNECTIONS,
+            LOAD_ISOLATION,
+        )
+        write_report(report, LOAD_REPORT)
+
+        unexpected = set(report["errors"]) - {SERIALIZATION_FAILURE, DEADLOCK_DETECTED}
+        self.assertFalse(
+            unexpected, f"Unexpected errors under load: {report['errors']}"
+        )
+        self.assertGreater(report["completed"], 0)
+
+        leftover = await self.connection.fetchone(
+            "SELECT COUNT(*) FROM people WHERE name LIKE %s", ("load-%",)
+        )
+        self.assertEqual(leftover[0], 0, "Load scenario rows should be cleaned up.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# проверка планов запросов к people на заполненной таблице,
+# запускается только при заданном размере:
+# ```$env:TEST_PLAN_ROWS="10000"
+# python -m unittest tests/test_db_people_plans.py
+# $env:TEST_PLAN_ROWS=$null```
+# эталонные планы хранятся в tests/plan_baselines.json (файл коммитится в
+# репозиторий, без него проверка падает), для их записи или обновления
+# дополнительно задать TEST_UPDATE_PLAN_BASELINES="1"
+
+import os
+import unittest
+
+from tests.helpers import BaseClassForDateBase
+from tests.plans import PlanBaselines, check_plan, explain, plan_shape
+
+PLAN_ROWS = int(os.getenv("TEST_PLAN_ROWS", "0"))
+INDEX_SCANS = ("Index Scan", "Index Only Scan")
+
+
+@unittest.skipUnless(PLAN_ROWS, "TEST_PLAN_ROWS is not set")
+class PlanTestPeopleTable(BaseClassForDateBase):
+    isolation = "savepoint"
+
+    @classmethod
+    def setUpClass(cls):
+        """Seed people and refresh its statistics; every test runs in a savepoint."""
+        super().setUpClass()
+        cls.baselines = PlanBaselines()
+        with cls.seed_people(PLAN_ROWS) as cursor:
+            cursor.execute("SELECT (MIN(index) + MAX(index)) / 2 FROM people")
+            cls.middle_index = cursor.fetchone()[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.baselines.save()
+        super().tearDownClass()
+
+    def assertPlan(self, name, query, params=None, **expectations):
+        """Explain query, check it against expectations and its stored baseline."""
+        plan = explain(self.cursor, query, params)
+        problems = check_plan(plan, **expectations)
+        regression = self.baselines.compare(name, plan_shape(plan))
+        if regression:
+            problems.append(regression)
+        self.assertFalse(problems, f"Plan check for {name} failed: {problems}")
+
+    def test_lookup_by_index_uses_index(self):
+        """Plan: lookup by index -> index scan, one row, few buffers."""
+        self.assertPlan(
+            "lookup_by_index",
+            "SELECT * FROM people WHERE index = %s",
+            (self.middle_index,),
+            expect_any=INDEX_SCANS,
+            forbid=("Seq Scan",),
+            max_buffers=10,
+            max_rows=1,
+        )
+
+    def test_update_by_index_uses_index(self):
+        """Plan: update by index -> index scan under the update."""
+        self.assertPlan(
+            "update_by_index",
+            "UPDATE people SET name = %s WHERE index = %s",
+            ("Алексей", self.middle_index),
+            expect_any=INDEX_SCANS,
+            forbid=("Seq Scan",),
+            max_buffers=50,
+            max_rows=1,
+        )
+
+    def test_delete_by_index_uses_index(self):
+        """Plan: delete by index -> index scan under the delete."""
+        self.assertPlan(
+            "delete_by_index",
+            "DELETE FROM people WHERE index = %s",
+            (self.middle_index,),
+            expect_any=INDEX_SCANS,
+            forbid=("Seq Scan",),
+            max_buffers=50,
+            max_rows=1,
+        )
+
+    def test_max_index_reads_index_end(self):
+        """Plan: COALESCE(MAX(index), 0) -> reads one end of the index."""
+        self.assertPlan(
+            "max_index",
+            "SELECT COALESCE(MAX(index), 0) FROM people",
+            expect_any=INDEX_SCANS,
+            forbid=("Seq Scan",),
+            max_buffers=10,
+            max_rows=1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
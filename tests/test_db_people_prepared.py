@@ -0,0 +1,114 @@
+# сравнение задержек с кэшем подготовленных выражений и без него,
+# запускается только при заданном числе вызовов:
+# ```$env:TEST_PREPARED_BENCHMARK_CALLS="5000"
+# python -m unittest tests/test_db_people_prepared.py
+# $env:TEST_PREPARED_BENCHMARK_CALLS=$null```
+# отчёт пишется в TEST_PREPARED_REPORT (по умолчанию prepared_report.json)
+# остальные тесты используют кэш, только если задан TEST_PREPARED_STATEMENTS
+
+import os
+import random
+import unittest
+
+from tests.datagen import people_generator
+from tests.helpers import BaseClassForDateBase
+from tests.prepared import CACHE_SIZE, DEFAULT_CACHE_SIZE, PREPARE_THRESHOLD
+from tests.scale import SCALE_SEED, new_report, summarize, time_call, write_report
+
+BENCHMARK_CALLS = int(os.getenv("TEST_PREPARED_BENCHMARK_CALLS", "0"))
+BENCHMARK_ROWS = int(os.getenv("TEST_PREPARED_BENCHMARK_ROWS", "10000"))
+PREPARED_REPORT = os.getenv("TEST_PREPARED_REPORT", "prepared_report.json")
+
+
+@unittest.skipUnless(BENCHMARK_CALLS, "TEST_PREPARED_BENCHMARK_CALLS is not set")
+class PreparedStatementBenchmark(BaseClassForDateBase):
+    isolation = "savepoint"
+
+    @classmethod
+    def setUpClass(cls):
+        """Seed people once; every test runs in a savepoint."""
+        super().setUpClass()
+        cls.report = new_report(
+            "people_prepared",
+            rows=BENCHMARK_ROWS,
+            calls=BENCHMARK_CALLS,
+            cache_size=CACHE_SIZE or DEFAULT_CACHE_SIZE,
+            threshold=PREPARE_THRESHOLD,
+        )
+        with cls.seed_people(BENCHMARK_ROWS) as cursor:
+            cursor.execute("SELECT MIN(index), MAX(index) FROM people")
+            cls.index_range = cursor.fetchone()
+
+    @classmethod
+    def tearDownClass(cls):
+        write_report(cls.report, PREPARED_REPORT)
+        super().tearDownClass()
+
+    def compare(self, operation, query, params_list, fetch=False):
+        """Time query as plain text and through the cache; return both results."""
+        summaries = {}
+        results = {}
+        for mode in ("text", "prepared"):
+            cursor = self.connection.cursor()
+            cursor.prepare = mode == "prepared"
+            latencies = []
+            rows = []
+            for params in params_list:
+                latencies.append(time_call(cursor.execute, query, params))
+                if fetch:
+                    rows.append(cursor.fetchall())
+            cursor.close()
+            summaries[mode] = summarize(latencies)
+            results[mode] = rows
+        text_p50 = summaries["text"]["p50_ms"]
+        prepared_p50 = summaries["prepared"]["p50_ms"]
+        self.report["operations"][operation] = {
+            **summaries,
+            "p50_speedup": text_p50 / prepared_p50 if prepared_p50 else None,
+        }
+        if prepared_p50 > text_p50:
+            self.report["violations"][operation] = [
+                f"prepared p50 {prepared_p50:.3f} ms > text p50 {text_p50:.3f} ms"
+            ]
+        return results
+
+    def random_indexes(self):
+        rng = random.Random(f"{SCALE_SEED}-{self.id()}")
+        low, high = self.index_range
+        return [(rng.randint(low, high),) for _ in range(BENCHMARK_CALLS)]
+
+    def test_lookup_by_index(self):
+        """Benchmark: lookups by index return the same rows either way."""
+        results = self.compare(
+            "lookup_by_index",
+            "SELECT * FROM people WHERE index = %s",
+            self.random_indexes(),
+            fetch=True,
+        )
+        self.assertEqual(results["text"], results["prepared"])
+        self.assertNotIn("lookup_by_index", self.report["violations"])
+
+    def test_update_by_index(self):
+        """Benchmark: updates by index."""
+        self.compare(
+            "update_by_index",
+            "UPDATE people SET name = %s WHERE index = %s",
+            [("Алексей", index) for (index,) in self.random_indexes()],
+        )
+        self.assertNotIn("update_by_index", self.report["violations"])
+
+    def test_insert(self):
+        """Benchmark: inserts with TO_DATE."""
+        self.compare(
+            "insert",
+            """
+            INSERT INTO people (name, dateofbirth)
+            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD'))
+            """,
+            list(people_generator(SCALE_SEED).rows(BENCHMARK_CALLS)),
+        )
+        self.assertNotIn("insert", self.report["violations"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# нагрузочные тесты таблицы people запускаются только при заданном размере:
+# ```$env:TEST_SCALE_ROWS="1000000"
+# python -m unittest tests/test_db_people_scale.py
+# $env:TEST_SCALE_ROWS=$null```
+# бюджеты задаются через TEST_SCALE_BUDGETS (JSON или путь к JSON-файлу),
+# отчёт пишется в TEST_SCALE_REPORT (по умолчанию scale_report.json)
+
+import random
+import unittest
+
+from tests.datagen import people_generator
+from tests.helpers import BaseClassForDateBase
+from tests.scale import (
+    SCALE_OPERATIONS,
+    SCALE_REPEATS,
+    SCALE_REPORT,
+    SCALE_ROWS,
+    SCALE_SEED,
+    check_budget,
+    load_budgets,
+    new_report,
+    summarize,
+    time_call,
+    write_report,
+)
+
+
+@unittest.skipUnless(SCALE_ROWS, "TEST_SCALE_ROWS is not set")
+class ScaleTestPeopleTable(BaseClassForDateBase):
+    isolation = "savepoint"
+
+    @classmethod
+    def setUpClass(cls):
+        """Seed people once for the class; every test runs in a savepoint."""
+        super().setUpClass()
+        cls.budgets = load_budgets()
+        cls.report = new_report(
+            "people_scale",
+            rows=SCALE_ROWS,
+            operations=SCALE_OPERATIONS,
+            repeats=SCALE_REPEATS,
+            seed=SCALE_SEED,
+        )
+        with cls.seed_people(SCALE_ROWS) as cursor:
+            cursor.execute("SELECT MIN(index), MAX(index) FROM people")
+            cls.index_range = cursor.fetchone()
+            cursor.execute("SHOW server_version")
+            cls.report["server_version"] = cursor.fetchone()[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        write_report(cls.report, SCALE_REPORT)
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.random = random.Random(f"{SCALE_SEED}-{self.id()}")
+
+    def random_indexes(self, count=SCALE_OPERATIONS):
+        low, high = self.index_range
+        return [self.random.randint(low, high) for _ in range(count)]
+
+    def check_operation(self, operation, latencies, operations=None):
+        """Record an operation in the report and assert it stays in budget."""
+        summary = summarize(latencies, operations)
+        violations = check_budget(summary, self.budgets.get(operation, {}))
+        self.report["operations"][operation] = summary
+        if violations:
+            self.report["violations"][operation] = violations
+        self.assertFalse(violations, f"{operation} is over budget: {violations}")
+
+    def test_insert(self):
+        """Scale: single-row inserts into a populated people table."""
+        insert_query = """
+            INSERT INTO people (name, dateofbirth)
+            VALUES (%s, TO_DATE(%s, 'YYYY-MM-DD'))
+        """
+        rows = people_generator(SCALE_SEED + 1).rows(SCALE_OPERATIONS)
+        latencies = [time_call(self.cursor.execute, insert_query, row) for row in rows]
+        self.check_operation("insert", latencies)
+
+    def test_lookup_by_index(self):
+        """Scale: point lookups by index."""
+        latencies = []
+        for index in self.random_indexes():
+            latencies.append(
+                time_call(
+                    self.cursor.execute,
+                    "SELECT * FROM people WHERE index = %s",
+                    (index,),
+                )
+            )
+            self.cursor.fetchone()
+        self.check_operation("lookup_by_index", latencies)
+
+    def test_update_by_index(self):
+        """Scale: updates by index."""
+        update_query = """UPDATE people SET name = %s WHERE index = %s"""
+        latencies = [
+            time_call(self.cursor.execute, update_query, ("Алексей", index))
+            for index in self.random_indexes()
+        ]
+        self.check_operation("update_by_index", latencies)
+
+    def test_delete_by_index(self):
+        """Scale: deletes by index."""
+        delete_query = """DELETE FROM people WHERE index = %s"""
+        latencies = [
+            time_call(self.cursor.execute, delete_query, (index,))
+            for index in self.random_indexes()
+        ]
+        self.check_operation("delete_by_index", latencies)
+
+    def test_count(self):
+        """Scale: full COUNT(*) over people."""
+        latencies = []
+        for _ in range(SCALE_REPEATS):
+            latencies.append(
+                time_call(self.cursor.execute, "SELECT COUNT(*) FROM people")
+            )
+            self.assertGreaterEqual(self.cursor.fetchone()[0], SCALE_ROWS)
+        self.check_operation("count", latencies)
+
+    def test_order_by_name_dateofbirth(self):
+        """Scale: stream the whole table ordered by name and dateofbirth."""
+        rows = 0
+
+        def scan():
+            nonlocal rows
+            with self.connection.cursor(name="scale_order_by") as cursor:
+                cursor.itersize = 10000
+                cursor.execute(
+                    "SELECT name, dateofbirth FROM people ORDER BY name, dateofbirth"
+                )
+                for _ in cursor:
+                    rows += 1
+
+        latency = time_call(scan)
+        self.assertGreaterEqual(rows, SCALE_ROWS)
+        self.check_operation("order_by_name_dateofbirth", [latency], rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,53 +3,29 @@
 # ```$env:TEST_ENV="local"
 # python -m unittest <путь>
 # $env:TEST_ENV=$null```
+# изоляция тестов через точки сохранения в одной транзакции на класс:
+# ```$env:TEST_ISOLATION="savepoint"```
 
 import unittest
 
 import psycopg2
 from psycopg2 import errors
-from dotenv import load_dotenv
 from tests.helpers import BaseClassForDateBase
-
-load_dotenv()
+from tests.schema_snapshot import SchemaDiff, table_names
 
 
 class PositiveTests(BaseClassForDateBase):
+    schema_tables = ("persons",)
+
     def test_rename_table(self):
         """Test: Rename table -> table is renamed successfully."""
 
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        structure_before_rename = self.cursor.fetchall()
-
         self.cursor.execute("ALTER TABLE Persons RENAME TO RenamedPersons;")
 
-        self.cursor.execute(
-            """
-            SELECT * FROM information_schema.tables 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        self.assertIsNone(self.cursor.fetchone(), "Table 'Persons' should not exist")
-
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'renamedpersons' AND table_schema = 'public';
-            """
-        )
-        structure_after_rename = self.cursor.fetchall()
-
         self.assertEqual(
-            structure_before_rename,
-            structure_after_rename,
-            "Table's structure is changed, but it shouldn't",
+            self.schema_diff(),
+            SchemaDiff(renamed_tables=(("persons", "renamedpersons"),)),
+            "Table 'Persons' should be renamed and its structure should not change",
         )
 
         self.connection.rollback()
@@ -57,42 +33,13 @@ class PositiveTests(BaseClassForDateBase):
     def test_rename_column(self):
         """Test: Rename column -> column is renamed successfully."""
 
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        structure_before = self.cursor.fetchall()
-
         self.cursor.execute(
             "ALTER TABLE persons RENAME COLUMN FirstName TO First_Name;"
         )
 
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        structure_after = self.cursor.fetchall()
-
-        column_diff = [
-            (col_before, col_after)
-            for col_before, col_after in zip(structure_before, structure_after)
-            if col_before != col_after
-        ]
-
-        self.assertEqual(
-            len(column_diff),
-            1,
-            "Различий должно быть ровно одно — переименование столбца.",
-        )
         self.assertEqual(
-            column_diff[0],
-            (("firstname", "character varying"), ("first_name", "character varying")),
+            self.schema_diff(),
+            SchemaDiff(renamed_columns=(("persons", "firstname", "first_name"),)),
             "Ожидаемое различие — переименование столбца FirstName в First_Name.",
         )
 
@@ -101,69 +48,25 @@ class PositiveTests(BaseClassForDateBase):
     def test_add_column(self):
         """Test: Add column -> column is added successfully."""
 
-        self.cursor.execute(
-            """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        structure_before = self.cursor.fetchall()
-
         self.cursor.execute("ALTER TABLE persons ADD COLUMN Age int;")
 
-        self.cursor.execute(
-            """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        structure_after = self.cursor.fetchall()
-
         self.assertEqual(
-            len(structure_after),
-            len(structure_before) + 1,
-            "The number of columns was expected to increase by 1.",
+            self.schema_diff(),
+            SchemaDiff(added_columns=(("persons", "age", "integer"),)),
+            "The 'Age' column should be added.",
         )
 
-        new_column = ("age",)
-        self.assertIn(new_column, structure_after, "The 'Age' column should be added.")
-
         self.connection.rollback()
 
     def test_delete_column(self):
         """Test: Delete column -> column is deleted successfully."""
 
-        self.cursor.execute(
-            """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        structure_before = self.cursor.fetchall()
-
         self.cursor.execute("ALTER TABLE persons DROP COLUMN Hobby;")
 
-        self.cursor.execute(
-            """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND table_schema = 'public';
-            """
-        )
-        structure_after = self.cursor.fetchall()
-
         self.assertEqual(
-            len(structure_after),
-            len(structure_before) - 1,
-            "The number of columns was expected to be decreased by 1.",
-        )
-
-        deleted_column = ("hobby",)
-        self.assertNotIn(
-            deleted_column, structure_after, "The 'Hobby' column should be removed."
+            self.schema_diff(),
+            SchemaDiff(dropped_columns=(("persons", "hobby"),)),
+            "The 'Hobby' column should be removed.",
         )
 
         self.connection.rollback()
@@ -171,34 +74,17 @@ class PositiveTests(BaseClassForDateBase):
     def test_change_column_type(self):
         """Test: Change column type -> column type is changed successfully."""
 
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND column_name = 'dateofbirth' AND table_schema = 'public';
-            """
-        )
-        structure_before = self.cursor.fetchall()
-
         self.cursor.execute(
             "ALTER TABLE persons ALTER COLUMN DateOfBirth TYPE timestamp;"
         )
 
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND column_name = 'dateofbirth' AND table_schema = 'public';
-            """
-        )
-        structure_after = self.cursor.fetchall()
-
-        self.assertNotEqual(
-            structure_before, structure_after, "The column data type should be changed."
-        )
         self.assertEqual(
-            structure_after[0][1],
-            "timestamp without time zone",
+            self.schema_diff(),
+            SchemaDiff(
+                retyped_columns=(
+                    ("persons", "dateofbirth", "date", "timestamp without time zone"),
+                )
+            ),
             "The expected data type of the column is TIMESTAMP.",
         )
 
@@ -223,31 +109,14 @@ class PositiveTests(BaseClassForDateBase):
             ),
         )
 
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND column_name = 'dateofbirth' AND table_schema = 'public';
-            """
-        )
-        structure_before = self.cursor.fetchall()
-
         self.cursor.execute(
             "ALTER TABLE persons ALTER COLUMN DateOfBirth TYPE timestamp;"
         )
 
-        self.cursor.execute(
-            """
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = 'persons' AND column_name = 'dateofbirth' AND table_schema = 'public';
-            """
-        )
-
-        structure_after = self.cursor.fetchall()
-
-        self.assertNotEqual(
-            structure_before, structure_after, "The column data type should be changed."
+        self.assertEqual(
+            self.schema_diff().retyped_columns,
+            (("persons", "dateofbirth", "date", "timestamp without time zone"),),
+            "The column data type should be changed.",
         )
 
         self.cursor.execute(
@@ -272,21 +141,19 @@ class PositiveTests(BaseClassForDateBase):
     def test_delete_table(self):
         """Test: Delete table -> table is deleted from the database."""
 
-        self.cursor.execute(
-            "SELECT * FROM information_schema.tables WHERE table_name='persons';"
-        )
-        table_exists = self.cursor.fetchone()
-        self.assertIsNotNone(
-            table_exists, "The 'persons' table should exist before deleting."
+        self.assertIn(
+            "persons",
+            table_names(self.schema_baseline()),
+            "The 'persons' table should exist before deleting.",
         )
 
         self.cursor.execute("DROP TABLE persons;")
 
-        self.cursor.execute(
-            "SELECT * FROM information_schema.tables WHERE table_name='persons';"
+        self.assertEqual(
+            self.schema_diff(),
+            SchemaDiff(dropped_tables=("persons",)),
+            "The table 'persons' should be dropped.",
         )
-        table_deleted = self.cursor.fetchone()
-        self.assertIsNone(table_deleted, "The table 'persons' should be dropped.")
 
         self.connection.rollback()
 
@@ -294,24 +161,24 @@ class PositiveTests(BaseClassForDateBase):
 class NegativeTests(BaseClassForDateBase):
     def test_rename_nonexistent_table(self):
         """Test: Rename non-existent table -> error, table does not exist."""
-        self.cursor.execute(
+        rows = self.catalog_lookup(
             "SELECT table_name "
             "FROM information_schema.tables "
             "WHERE table_schema = 'public' AND table_name = 'nonexistenttable';"
         )
-        self.assertIsNone(self.cursor.fetchone(), "Table should not exist.")
+        self.assertEqual(rows, [], "Table should not exist.")
 
         with self.assertRaises(psycopg2.errors.UndefinedTable):
             self.cursor.execute("ALTER TABLE NonExistentTable RENAME TO NewTableName;")
 
     def test_rename_nonexistent_column(self):
         """Test: Rename non-existent column -> error, failed to rename column."""
-        self.cursor.execute(
+        rows = self.catalog_lookup(
             "SELECT column_name "
             "FROM information_schema.columns "
             "WHERE table_name = 'persons' AND column_name = 'non_existing_column';"
         )
-        self.assertIsNone(self.cursor.fetchone(), "Column should not exist.")
+        self.assertEqual(rows, [], "Column should not exist.")
 
         with self.assertRaises(psycopg2.errors.UndefinedColumn):
             self.cursor.execute(
@@ -320,36 +187,36 @@ class NegativeTests(BaseClassForDateBase):
 
     def test_add_existing_column(self):
         """Test: Add existing column -> error, failed to add column."""
-        self.cursor.execute(
+        rows = self.catalog_lookup(
             "SELECT column_name "
             "FROM information_schema.columns "
             "WHERE table_name = 'persons' AND column_name = 'firstname';"
         )
-        self.assertIsNotNone(self.cursor.fetchone(), "Column FirstName should exist..")
+        self.assertNotEqual(rows, [], "Column FirstName should exist..")
 
         with self.assertRaises(psycopg2.errors.DuplicateColumn):
             self.cursor.execute("ALTER TABLE persons ADD COLUMN FirstName varchar;")
 
     def test_delete_nonexistent_column(self):
         """Test: Delete non-existent column -> error, failed to delete column."""
-        self.cursor.execute(
+        rows = self.catalog_lookup(
             "SELECT column_name "
             "FROM information_schema.columns "
             "WHERE table_name = 'persons' AND column_name = 'non_existing_column';"
         )
-        self.assertIsNone(self.cursor.fetchone(), "Column should not exist.")
+        self.assertEqual(rows, [], "Column should not exist.")
 
         with self.assertRaises(psycopg2.errors.UndefinedColumn):
             self.cursor.execute("ALTER TABLE persons DROP COLUMN non_existing_column;")
 
     def test_change_column_type_incompatible(self):
         """Change data type to incompatible -> error, failed to change data."""
-        self.cursor.execute(
+        rows = self.catalog_lookup(
             "SELECT data_type "
             "FROM information_schema.columns "
             "WHERE table_name = 'persons' AND column_name = 'dateofbirth';"
         )
-        current_type = self.cursor.fetchone()[0]
+        current_type = rows[0][0]
         self.assertEqual(current_type, "date", "The column data type must be date.")
 
         with self.assertRaises(psycopg2.errors.DatatypeMismatch):
@@ -0,0 +1,60 @@
+# влияние ALTER TABLE на живой трафик к persons: блокировки и ожидания запросов
+# ```$env:TEST_DDL_IMPACT="1"
+# python -m unittest tests/test_db_persons_ddl_impact.py
+# $env:TEST_DDL_IMPACT=$null```
+# отчёт пишется в TEST_DDL_IMPACT_REPORT (по умолчанию ddl_impact_report.json)
+
+import os
+import unittest
+
+from tests.ddl_impact import DDL_SCENARIOS, run_ddl_impact
+from tests.helpers import BaseClassForDateBase
+from tests.scale import new_report, write_report
+
+DDL_IMPACT = bool(os.getenv("TEST_DDL_IMPACT"))
+DDL_IMPACT_REPORT = os.getenv("TEST_DDL_IMPACT_REPORT", "ddl_impact_report.json")
+DDL_IMPACT_READERS = int(os.getenv("TEST_DDL_IMPACT_READERS", "4"))
+DDL_IMPACT_WRITERS = int(os.getenv("TEST_DDL_IMPACT_WRITERS", "2"))
+
+REWRITING_SCENARIOS = {"test_change_column_type"}
+
+
+@unittest.skipUnless(DDL_IMPACT, "TEST_DDL_IMPACT is not set")
+class DDLImpactTests(BaseClassForDateBase):
+    isolation = "connection"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = new_report(
+            "persons_ddl_impact",
+            readers=DDL_IMPACT_READERS,
+            writers=DDL_IMPACT_WRITERS,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        write_report(cls.report, DDL_IMPACT_REPORT)
+        super().tearDownClass()
+
+    def test_alter_table_under_traffic(self):
+        """DDL impact: each ALTER from PositiveTests under live reads and writes."""
+        for scenario, ddl in DDL_SCENARIOS.items():
+            with self.subTest(scenario=scenario):
+                impact = run_ddl_impact(
+                    self.db_config,
+                    ddl,
+                    readers=DDL_IMPACT_READERS,
+                    writers=DDL_IMPACT_WRITERS,
+                )
+                self.report["operations"][scenario] = impact
+                self.assertEqual(
+                    impact["rewrites_table"],
+                    scenario in REWRITING_SCENARIOS,
+                    f"Unexpected table rewrite classification for {scenario}.",
+                )
+                self.assertEqual(impact["traffic_errors"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# стоимость перезаписи таблицы persons при смене типа DateOfBirth на timestamp
+# ```$env:TEST_REWRITE_SIZES="100000,1000000,10000000"
+# python -m unittest tests/test_db_persons_rewrite_cost.py
+# $env:TEST_REWRITE_SIZES=$null```
+# отчёт пишется в TEST_REWRITE_REPORT (по умолчанию rewrite_cost_report.json)
+
+import os
+import time
+import unittest
+
+from tests.binary_copy import copy_columns, missing_from_columns
+from tests.datagen import persons_generator
+from tests.helpers import BaseClassForDateBase
+from tests.scale import SCALE_SEED, new_report, write_report
+
+REWRITE_SIZES = [
+    int(size) for size in os.getenv("TEST_REWRITE_SIZES", "").split(",") if size
+]
+REWRITE_SAMPLE_EVERY = int(os.getenv("TEST_REWRITE_SAMPLE_EVERY", "1000"))
+REWRITE_REPORT = os.getenv("TEST_REWRITE_REPORT", "rewrite_cost_report.json")
+# FirstName of every sampled row: names from the generator's small pool repeat,
+# so only a unique one ties a converted row to the row that was loaded.
+SAMPLE_NAME = "rewrite_{}"
+
+PERSONS_COLUMNS = (
+    "firstname",
+    "familyname",
+    "dateofbirth",
+    "placeofbirth",
+    "occupation",
+    "hobby",
+)
+SIZES_QUERY = """
+    SELECT pg_table_size('persons'), pg_indexes_size('persons'),
+           pg_total_relation_size('persons')
+"""
+
+
+@unittest.skipUnless(REWRITE_SIZES, "TEST_REWRITE_SIZES is not set")
+class RewriteCostTests(BaseClassForDateBase):
+    isolation = "savepoint"
+
+    def relation_sizes(self):
+        self.cursor.execute(SIZES_QUERY)
+        table, indexes, total = self.cursor.fetchone()
+        return {"table_bytes": table, "index_bytes": indexes, "total_bytes": total}
+
+    def test_change_column_type_at_scale(self):
+        """Rewrite cost: DateOfBirth date -> timestamp on seeded persons."""
+        report = new_report(
+            "persons_rewrite_cost",
+            sizes=REWRITE_SIZES,
+            sample_every=REWRITE_SAMPLE_EVERY,
+            seed=SCALE_SEED,
+        )
+        self.cursor.execute("SHOW wal_level")
+        report["wal_level"] = self.cursor.fetchone()[0]
+
+        for size in REWRITE_SIZES:
+            with self.subTest(size=size):
+                self.cursor.execute("SAVEPOINT rewrite_size")
+                try:
+                    report["operations"][str(size)] = self.measure_rewrite(size)
+                finally:
+                    self.cursor.execute(
+                        "ROLLBACK TO SAVEPOINT rewrite_size; "
+                        "RELEASE SAVEPOINT rewrite_size"
+                    )
+        write_report(report, REWRITE_REPORT)
+
+    def measure_rewrite(self, size):
+        expected_sample = set()
+
+        def seed_rows():
+            rows = persons_generator(SCALE_SEED).rows(size)
+            for number, row in enumerate(rows):
+                if number % REWRITE_SAMPLE_EVERY == 0:
+                    row = (SAMPLE_NAME.format(number), *row[1:])
+                    expected_sample.add((row[0], f"{row[2]}T00:00:00"))
+                yield row
+
+        self.bulk_load("persons", PERSONS_COLUMNS, seed_rows())
+        sizes_before = self.relation_sizes()
+
+        self.cursor.execute("SELECT pg_current_wal_lsn()")
+        lsn_before = self.cursor.fetchone()[0]
+        started = time.perf_counter()
+        self.cursor.execute(
+            "ALTER TABLE persons ALTER COLUMN DateOfBirth TYPE timestamp;"
+        )
+        elapsed = time.perf_counter() - started
+        self.cursor.execute(
+            "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s)", (lsn_before,)
+        )
+        wal_bytes = int(self.cursor.fetchone()[0])
+        sizes_after = self.relation_sizes()
+
+        # Binary COPY into columnar arrays: no Python tuple per scanned row.
+        self.reader = copy_columns(
+            self.cursor,
+            "SELECT FirstName, DateOfBirth FROM persons",
+            ("text", "timestamp"),
+            reader=getattr(self, "reader", None),
+        )
+        missing = missing_from_columns(self.reader, expected_sample)
+        self.assertFalse(missing, f"Rows were not converted correctly: {missing}")
+
+        return {
+            "rows": size,
+            "wall_seconds": elapsed,
+            "wal_bytes": wal_bytes,
+            "before": sizes_before,
+            "after": sizes_after,
+            "verified_rows": len(expected_sample),
+        }
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# проверка кэша подготовленных выражений на имитации сервера (без подключения
+# к БД):
+# ```python -m unittest tests/test_prepared.py```
+
+import re
+import unittest
+from types import SimpleNamespace
+
+import psycopg2
+from psycopg2 import extensions
+
+from tests.prepared import StatementCache
+
+FAILING_PREPARE = "SELECT $1 AS untyped"
+
+
+class FakeServer:
+    """Prepared statements of one session; DEALLOCATE and PREPARE can fail.
+
+    Like PostgreSQL, prepared statements are not transactional: a rollback
+    to a savepoint neither restores a deallocated statement nor drops a new
+    one.
+    """
+
+    def __init__(self):
+        self.prepared = set()
+        self.sent = []
+        self.rejected = []
+
+    def execute(self, query, vars):
+        self.sent.append(query)
+        for command in query.split("; "):
+            self.run(command.strip())
+
+    def run(self, command):
+        if command == "DEALLOCATE ALL":
+            self.prepared.clear()
+        elif command.startswith("DEALLOCATE "):
+            self.drop(command.split()[1])
+        elif command.startswith("PREPARE "):
+            name, text = re.match(r"PREPARE (\w+) AS (.*)", command).groups()
+            if text == FAILING_PREPARE:
+                self.reject(command)
+            self.prepared.add(name)
+        elif command.startswith("EXECUTE "):
+            if re.match(r"EXECUTE (\w+)", command).group(1) not in self.prepared:
+                self.reject(command)
+
+    def drop(self, name):
+        if name not in self.prepared:
+            self.reject(f"DEALLOCATE {name}")
+        self.prepared.discard(name)
+
+    def reject(self, command):
+        self.rejected.append(command)
+        raise psycopg2.Error(command)
+
+
+class StatementCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeServer()
+        self.cursor = SimpleNamespace(
+            connection=SimpleNamespace(
+                autocommit=False,
+                info=SimpleNamespace(
+                    transaction_status=extensions.TRANSACTION_STATUS_INTRANS
+                ),
+            )
+        )
+        self.cache = StatementCache(size=1, threshold=1)
+
+    def execute(self, query, vars=(1,)):
+        self.cache.execute(self.cursor, self.server.execute, query, vars)
+        return self.server.sent[-1]
+
+    def test_prepares_hot_statement(self):
+        """Statement cache: the threshold-th run prepares, later runs EXECUTE."""
+        self.assertEqual(self.execute("SELECT %s AS a"), "EXECUTE harness_1(%s)")
+        self.assertEqual(self.execute("SELECT %s AS a"), "EXECUTE harness_1(%s)")
+        self.assertEqual(self.cache.stats["prepares"], 1)
+
+    def test_eviction_then_failed_prepare(self):
+        """Statement cache: a failed PREPARE does not resend an evicted DEALLOCATE."""
+        self.execute("SELECT %s AS a")
+        # Evicts harness_1; its DEALLOCATE runs, then PREPARE fails.
+        self.assertEqual(self.execute("SELECT %s AS untyped"), "SELECT %s AS untyped")
+        self.assertNotIn("harness_1", self.server.prepared)
+
+        self.assertEqual(self.execute("SELECT %s AS c"), "EXECUTE harness_3(%s)")
+        self.assertEqual(
+            self.server.rejected, [f"PREPARE harness_2 AS {FAILING_PREPARE}"]
+        )
+        self.assertEqual(self.cache.stats["prepares"], 2)
+        self.assertEqual(self.cache.stats["failures"], 1)
+
+    def test_failed_deallocate_drops_everything(self):
+        """Statement cache: a rejected DEALLOCATE falls back to DEALLOCATE ALL once."""
+        self.execute("SELECT %s AS a")
+        self.server.prepared.discard("harness_1")
+        self.assertEqual(self.execute("SELECT %s AS b"), "SELECT %s AS b")
+        self.assertEqual(self.execute("SELECT %s AS c"), "EXECUTE harness_2(%s)")
+        self.assertEqual(self.server.rejected, ["DEALLOCATE harness_1"])
+        self.assertIn(
+            "SAVEPOINT harness_prepare; DEALLOCATE ALL; "
+            "RELEASE SAVEPOINT harness_prepare",
+            self.server.sent,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
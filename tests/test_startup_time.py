@@ -0,0 +1,65 @@
+# проверка времени импорта тестовых модулей (без подключения к БД):
+# ```python -m unittest tests/test_startup_time.py```
+# проверка бюджета времени импорта запускается, только если задан
+# TEST_STARTUP_BUDGET_MS (на медленных машинах время импорта нестабильно)
+
+import os
+import subprocess
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_MODULES = (
+    "tests.test_db_people_data_filling_operations",
+    "tests.test_db_persons_check_table_change",
+)
+STARTUP_BUDGET_MS = float(os.getenv("TEST_STARTUP_BUDGET_MS", "0"))
+LAZY_MODULES = ("faker", "numpy", "dotenv")
+
+
+def import_times(modules):
+    """Import modules in a fresh interpreter; return {module: cumulative ms}.
+
+    Parses the -X importtime breakdown, so nested imports are listed too.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+class StartupTimeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.times = import_times(STARTUP_MODULES)
+
+    def test_heavy_modules_are_lazy(self):
+        """Startup: faker, numpy and dotenv are not imported until used."""
+        imported = [name for name in LAZY_MODULES if name in self.times]
+        self.assertFalse(imported, f"Imported at startup: {imported}")
+
+    @unittest.skipUnless(STARTUP_BUDGET_MS, "set TEST_STARTUP_BUDGET_MS to check")
+    def test_import_within_budget(self):
+        """Startup: importing the test modules stays within the budget."""
+        total = sum(self.times[name] for name in STARTUP_MODULES)
+        slowest = sorted(self.times.items(), key=lambda item: -item[1])[:10]
+        self.assertLessEqual(
+            total,
+            STARTUP_BUDGET_MS,
+            f"Import took {total:.1f} ms, slowest: {slowest}",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
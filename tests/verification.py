@@ -0,0 +1,95 @@
+import datetime
+import itertools
+import os
+
+from psycopg2 import sql
+
+STREAM_ITERSIZE = int(os.getenv("TEST_STREAM_ITERSIZE", "2000"))
+
+_cursor_names = itertools.count()
+
+COLUMN_TYPES_QUERY = """
+    SELECT a.attname, format_type(a.atttypid, NULL)
+    FROM pg_catalog.pg_attribute a
+    WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+      AND a.attname::text = ANY(%s::text[])
+"""
+
+
+def iso_dates(row):
+    """Normalize a fetched row so dates compare equal to 'YYYY-MM-DD' strings."""
+    return tuple(
+        value.isoformat() if isinstance(value, datetime.date) else value
+        for value in row
+    )
+
+
+def stream_missing_rows(
+    connection,
+    query,
+    expected,
+    params=None,
+    normalize=iso_dates,
+    itersize=STREAM_ITERSIZE,
+):
+    """Return the expected rows that query does not produce.
+
+    Rows are read through a named (server-side) cursor itersize rows at a time
+    and the scan stops as soon as every expected row has been seen, so memory
+    use does not depend on the size of the table.
+    """
+    missing = set(expected)
+    if not missing:
+        return missing
+
+    with connection.cursor(name=f"verify_{next(_cursor_names)}") as cursor:
+        cursor.itersize = itersize
+        cursor.execute(query, params)
+        for row in cursor:
+            missing.discard(normalize(row))
+            if not missing:
+                break
+    return missing
+
+
+def column_types(cursor, table, columns):
+    """SQL types of table's columns without their typmod, in the order of columns.
+
+    The expected values are cast to these types: with the typmod a cast to
+    varchar(10) or numeric(5, 2) would silently truncate or round a value
+    that the table does not hold, and the check would pass.
+    """
+    cursor.execute(COLUMN_TYPES_QUERY, (table, [c.lower() for c in columns]))
+    types = dict(cursor.fetchall())
+    return tuple(types[column.lower()] for column in columns)
+
+
+def missing_table_rows(cursor, table, columns, types, expected):
+    """Return the expected rows that table does not contain, in one query.
+
+    Each column of expected is sent as one array parameter and unnested next
+    to the table, so the check costs a single round trip and one index or
+    hash probe per expected row instead of one query per row or a full scan.
+    Values are compared with =, so NULLs never match.
+    """
+    expected = list(expected)
+    if not expected:
+        return []
+    names = [sql.Identifier(f"c{number}") for number in range(len(columns))]
+    query = sql.SQL(
+        "SELECT e.n FROM unnest({arrays}) WITH ORDINALITY AS e({names}, n) "
+        "WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {matches}) ORDER BY e.n"
+    ).format(
+        arrays=sql.SQL(", ").join(
+            sql.SQL("%s::{}[]").format(sql.SQL(column_type))
+            for column_type in types
+        ),
+        names=sql.SQL(", ").join(names),
+        table=sql.Identifier(table),
+        matches=sql.SQL(" AND ").join(
+            sql.SQL("t.{} = e.{}").format(sql.Identifier(column), name)
+            for column, name in zip(columns, names)
+        ),
+    )
+    cursor.execute(query, [list(values) for values in zip(*expected)])
+    return [expected[number - 1] for (number,) in cursor.fetchall()]